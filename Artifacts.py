@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import time
+from functools import cached_property
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from TreeInfer import ARRAY_FIELDS, CompiledEnsemble, compile_lgbm, compile_rf
+
+STORE_DIR = "artifacts"
+MANIFEST = "manifest.json"
+LATEST = "LATEST"
+NATIVE_MODELS = {"rf": "rf.joblib", "lgbm": "lgbm.joblib"}
+
+# Atribut MinMaxScaler yang disimpan di manifest (cukup untuk transform)
+SCALER_ATTRS = ("min_", "scale_", "data_min_", "data_max_", "data_range_")
+
+
+# ================================
+# Simpan versi baru
+# ================================
+def _scaler_params(scaler):
+    params = {name: getattr(scaler, name).tolist() for name in SCALER_ATTRS}
+    params["feature_range"] = list(scaler.feature_range)
+    params["n_samples_seen_"] = int(scaler.n_samples_seen_)
+    return params
+
+
+def _quantile_name(q):
+    return f"lgbm_q{round(q * 100):02d}"
+
+
+def publish(features, scaler, rf_model, lgbm_model, data_hash=None, metrics=None, lgbm_quantiles=None,
+            store_dir=STORE_DIR):
+    """Save one versioned set of model artifacts and mark it as latest.
+
+    Both models are compiled with ``TreeInfer`` (scaler folded in) and every
+    node array goes to its own ``.npy`` file, so ``open_store`` can load them
+    with ``mmap_mode="r"``. Feature list, scaler params, data hash and metrics
+    go into a small ``manifest.json``. ``lgbm_quantiles`` (quantile -> LightGBM
+    quantile model) are stored the same way. The original sklearn/LightGBM
+    models are kept next to them as joblib files (see ``native_models``).
+    Returns the version name.
+    """
+    version = time.strftime("%Y%m%d-%H%M%S") + (f"-{data_hash[:8]}" if data_hash else "")
+    version_dir = os.path.join(store_dir, version)
+    tmp_dir = f"{version_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    compiled_models = [("rf", compile_rf(rf_model, scaler)), ("lgbm", compile_lgbm(lgbm_model, scaler))]
+    compiled_models += [(_quantile_name(q), compile_lgbm(model, scaler))
+                        for q, model in sorted((lgbm_quantiles or {}).items())]
+
+    models = {}
+    for name, compiled in compiled_models:
+        for field, array in compiled.arrays().items():
+            np.save(os.path.join(tmp_dir, f"{name}.{field}.npy"), np.ascontiguousarray(array))
+        models[name] = compiled.meta()
+    for name, model in (("rf", rf_model), ("lgbm", lgbm_model)):
+        joblib.dump(model, os.path.join(tmp_dir, NATIVE_MODELS[name]))
+
+    manifest = {
+        "version": version,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "features": list(features),
+        "scaler": _scaler_params(scaler),
+        "data_hash": data_hash,
+        "metrics": metrics or {},
+        "models": models,
+        "quantiles": {_quantile_name(q): q for q in sorted(lgbm_quantiles or {})},
+        "native": NATIVE_MODELS,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Rename atomik: pembaca tidak pernah melihat versi yang setengah jadi
+    os.replace(tmp_dir, version_dir)
+    latest_tmp = os.path.join(store_dir, f"{LATEST}.tmp")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(latest_tmp, os.path.join(store_dir, LATEST))
+    return version
+
+
+# ================================
+# Baca (lazy, memory-mapped)
+# ================================
+class Artifacts:
+    """One stored version. Only the manifest is read up front.
+
+    ``rf`` and ``lgbm`` are ``CompiledEnsemble`` objects whose node arrays
+    are memory-mapped on first access, so processes loading the same version
+    share one page-cache copy. They expect raw (unscaled) features: pass
+    ``scaler=None`` to ``forecast_districts``.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def features(self):
+        return self.manifest["features"]
+
+    @property
+    def metrics(self):
+        return self.manifest["metrics"]
+
+    @cached_property
+    def scaler(self):
+        # MinMaxScaler dibangun ulang dari parameter di manifest (untuk model sklearn asli)
+        params = self.manifest["scaler"]
+        scaler = MinMaxScaler(feature_range=tuple(params["feature_range"]))
+        for name in SCALER_ATTRS:
+            setattr(scaler, name, np.array(params[name]))
+        scaler.n_samples_seen_ = params["n_samples_seen_"]
+        scaler.n_features_in_ = len(self.features)
+        scaler.feature_names_in_ = np.array(self.features, dtype=object)
+        return scaler
+
+    def _load_model(self, name):
+        arrays = {field: np.load(os.path.join(self.path, f"{name}.{field}.npy"), mmap_mode="r")
+                  for field in ARRAY_FIELDS}
+        return CompiledEnsemble.from_arrays(arrays, self.manifest["models"][name])
+
+    @cached_property
+    def rf(self):
+        return self._load_model("rf")
+
+    @cached_property
+    def lgbm(self):
+        return self._load_model("lgbm")
+
+    def native_models(self):
+        # (rf, lgbm) asli dari versi ini, untuk dipakai dengan self.scaler; None untuk versi lama
+        files = self.manifest.get("native")
+        if not files:
+            return None
+        return tuple(joblib.load(os.path.join(self.path, files[name])) for name in ("rf", "lgbm"))
+
+    @cached_property
+    def lgbm_quantiles(self):
+        # quantile -> model kuantil LightGBM (kosong untuk versi tanpa band)
+        return {q: self._load_model(name) for name, q in self.manifest.get("quantiles", {}).items()}
+
+
+def list_versions(store_dir=STORE_DIR):
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(name for name in os.listdir(store_dir)
+                  if os.path.exists(os.path.join(store_dir, name, MANIFEST)))
+
+
+def latest_version(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, LATEST)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Belum ada artifact di '{store_dir}'. Jalankan Train.py atau Artifacts.py dulu.")
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def open_store(version=None, store_dir=STORE_DIR):
+    version = version or latest_version(store_dir)
+    path = os.path.join(store_dir, version)
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        return Artifacts(path, json.load(f))
+
+
+if __name__ == "__main__":
+    # Migrasi: bungkus pickle lama (scaler.pkl, features.pkl, RFM.pkl, LGBMM.pkl) jadi satu versi
+    from Data import dataset_key
+    from Forecast import BAND_QUANTILES
+    from LGBM import quantile_model_path
+
+    lgbm_quantiles = {q: joblib.load(quantile_model_path(q)) for q in BAND_QUANTILES
+                      if os.path.exists(quantile_model_path(q))}
+    version = publish(joblib.load("features.pkl"), joblib.load("scaler.pkl"),
+                      joblib.load("RFM.pkl"), joblib.load("LGBMM.pkl"), data_hash=dataset_key(),
+                      lgbm_quantiles=lgbm_quantiles)
+    print(f"Saved artifacts version {version} -> {os.path.join(STORE_DIR, version)}")
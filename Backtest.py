@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from Data import TARGET, prepare_dataset, load_raw, smape
+from Forecast import forecast_districts
+
+RESULTS_PATH = "backtest_results.csv.gz"
+PRED_COLS = ["RF_Pred", "LGBM_Pred", "Blended_Pred"]
+
+
+# ================================
+# Rolling-origin (expanding window) folds
+# ================================
+def make_origins(start="2022-01-01", end="2024-01-01", step_months=3):
+    # Tiap origin = bulan pertama yang diprediksi; data training = semua bulan sebelumnya
+    return list(pd.date_range(start, end, freq=f"{step_months}MS"))
+
+
+def _run_fold(args):
+    fold, origin, horizon = args
+    import RF
+    import LGBM
+
+    data = prepare_dataset()
+    df, features = data["df"], data["features"]
+
+    # Train hanya dengan data sebelum origin (scaler juga)
+    train = df[df["Tanggal"] < origin]
+    scaler = MinMaxScaler()
+    X_train = scaler.fit_transform(train[features])
+    y_train = train[TARGET]
+
+    # Satu thread per model: paralelisme ada di level fold
+    rf_model = RF.train_rf(X_train, y_train, n_jobs=1)
+    lgbm_model = LGBM.train_lgbm(X_train, y_train, n_jobs=1, verbose=-1)
+
+    raw = load_raw()
+    history = raw[raw["Tanggal"] < origin]
+    pred = forecast_districts(history, features, scaler, rf_model, lgbm_model,
+                              periods=horizon, clip_negative=True)
+    pred["horizon"] = np.tile(np.arange(1, horizon + 1), len(pred) // horizon)
+
+    # Bandingkan dengan data aktual (horizon di luar data terakhir dibuang)
+    actual = raw[["Kabupaten_Kota", "Tanggal", TARGET]].rename(columns={TARGET: "Actual"})
+    result = pred.merge(actual, on=["Kabupaten_Kota", "Tanggal"], how="inner")
+    result.insert(0, "fold", fold)
+    result.insert(1, "origin", origin)
+    return result
+
+
+def run_backtest(origins=None, horizon=12, max_workers=None, path=RESULTS_PATH):
+    """Run every fold in a process pool and write one row per (fold, district, horizon)."""
+    if origins is None:
+        origins = make_origins()
+
+    # Siapkan feature cache sekali sebelum worker dibuat
+    prepare_dataset()
+
+    tasks = [(fold, pd.Timestamp(origin), horizon) for fold, origin in enumerate(origins)]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        results = pd.concat(pool.map(_run_fold, tasks), ignore_index=True)
+
+    results[PRED_COLS + ["Actual"]] = results[PRED_COLS + ["Actual"]].astype("float32")
+    results["horizon"] = results["horizon"].astype("int8")
+    results.to_csv(path, index=False, float_format="%.2f")
+    return results
+
+
+# ================================
+# Ringkasan metrik
+# ================================
+def load_results(path=RESULTS_PATH):
+    return pd.read_csv(path, parse_dates=["origin", "Tanggal"])
+
+
+def summarize(results, by=None):
+    # RMSE & SMAPE per model (opsional per kolom `by`, mis. "horizon" atau "Kabupaten_Kota")
+    def metrics(group):
+        row = {}
+        y_true = group["Actual"].to_numpy(dtype=float)
+        for col in PRED_COLS:
+            model = col.replace("_Pred", "")
+            y_pred = group[col].to_numpy(dtype=float)
+            row[f"{model}_RMSE"] = np.sqrt(np.mean((y_pred - y_true) ** 2))
+            row[f"{model}_SMAPE"] = smape(y_true, y_pred)
+        return pd.Series(row)
+
+    if by is None:
+        return metrics(results)
+    return results.groupby(by).apply(metrics)
+
+
+if __name__ == "__main__":
+    results = run_backtest()
+    print(f"Saved {len(results)} rows from {results['fold'].nunique()} folds to {RESULTS_PATH}")
+    print(summarize(results))
+    print(summarize(results, by="horizon"))
@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+import Ingest
+from Trace import _peak_rss_mb
+
+BENCH_DIR = "benchmarks"
+DATA_DIR = os.path.join(".cache", "bench")
+MONTHS_ID = ["Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli",
+             "Agustus", "September", "Oktober", "November", "Desember"]
+
+# Skala relatif terhadap Limao.csv (38 kabupaten x 84 bulan = 3.192 baris):
+# (jumlah kabupaten, tanggal mulai, tanggal akhir, frekuensi)
+SCALES = {
+    "1x": (38, "2018-01-01", "2024-12-01", "MS"),
+    "10x": (380, "2018-01-01", "2024-12-01", "MS"),
+    "100x": (1900, "2011-01-01", "2024-12-01", "MS"),      # 5x kabupaten, 2x riwayat
+    "1000x": (1250, "2018-01-01", "2024-12-31", "D"),      # harian, ~3,2 juta baris
+}
+STAGES = ("ingest", "features", "train", "forecast", "aggregate", "map")
+
+# Budget cold start dashboard: render pertama halaman Overview di proses baru
+STARTUP_BUDGET_S = 4.0
+STARTUP_BUDGET_MB = 250
+# Library yang tidak boleh ikut ter-import hanya untuk membuka Overview
+STARTUP_FORBIDDEN = ("sklearn", "lightgbm", "geopandas", "matplotlib", "seaborn", "scipy")
+
+
+# ================================
+# Generator data sintetis (skema Limao.csv)
+# ================================
+def _profiles(raw):
+    # Profil bulanan per kabupaten asli: rata-rata & std tiap kolom per bulan
+    month = raw["Tanggal"].dt.month
+    cols = ["Produksi_Padi_Ton_clean", "Suhu_Rata_C_clean", "Curah_Hujan_mm_clean", "Kelembapan_Persen_clean"]
+    grouped = raw.groupby([raw["Kabupaten_Kota"].astype(str), month])[cols]
+    means, stds = grouped.mean(), grouped.std().fillna(0)
+    districts = means.index.get_level_values(0).unique()
+    shape = (len(districts), 12, len(cols))
+    return means.to_numpy().reshape(shape), stds.to_numpy().reshape(shape), raw.groupby(
+        raw["Kabupaten_Kota"].astype(str))[["Latitude_dd", "Longitude_dd"]].first().loc[districts].to_numpy()
+
+
+def generate(scale, out_path, seed=42, source=Ingest.CSV_PATH):
+    """Write a synthetic dataset with the ``Limao.csv`` schema at ``scale``.
+
+    Every synthetic district copies the monthly profile of a random real
+    district, multiplied by its own size factor and noise, so distributions
+    and seasonality look like the real data. Daily scales split monthly
+    production evenly over the days of the month. Returns the row count.
+    """
+    n_districts, start, end, freq = SCALES[scale]
+    rng = np.random.default_rng(seed)
+    means, stds, coords = _profiles(Ingest.load_dataset() if source == Ingest.CSV_PATH else Ingest.read_csv(source).to_pandas())
+
+    dates = pd.date_range(start, end, freq=freq)
+    months = dates.month.to_numpy() - 1
+    template = rng.integers(len(means), size=n_districts)
+    size = rng.lognormal(0, 0.5, size=n_districts)
+
+    # (kabupaten, tanggal, kolom)
+    mean = means[template][:, months]
+    std = stds[template][:, months]
+    values = mean + std * rng.standard_normal(mean.shape) * 0.5
+    values[..., 0] = np.maximum(mean[..., 0] * size[:, None] * rng.lognormal(0, 0.3, mean.shape[:2]), 0)
+    if freq == "D":
+        values[..., 0] /= dates.days_in_month.to_numpy()
+    values[..., 1:] = np.maximum(values[..., 1:], 0.01)
+    values = np.round(values, 2)
+
+    names = np.array([f"Kabupaten Sintetis {i:05d}" for i in range(n_districts)])
+    lat_lon = coords[template] + rng.normal(0, 0.05, size=(n_districts, 2))
+    n_dates = len(dates)
+
+    table = pa.table({
+        "Tanggal": np.tile(dates.strftime("%Y-%m-%d").to_numpy(), n_districts),
+        "Tahun": np.tile(dates.year.to_numpy(), n_districts),
+        "Bulan": np.tile(np.array(MONTHS_ID)[months], n_districts),
+        "Kabupaten_Kota": np.repeat(names, n_dates),
+        "Latitude_dd": np.repeat(np.round(lat_lon[:, 0], 4), n_dates),
+        "Longitude_dd": np.repeat(np.round(lat_lon[:, 1], 4), n_dates),
+        "Produksi_Padi_Ton_clean": values[..., 0].ravel(),
+        "Suhu_Rata_C_clean": values[..., 1].ravel(),
+        "Curah_Hujan_mm_clean": values[..., 2].ravel(),
+        "Kelembapan_Persen_clean": values[..., 3].ravel(),
+    })
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    pv.write_csv(table, out_path)
+    return table.num_rows
+
+
+# ================================
+# Tahapan yang diukur
+# ================================
+def run_scale(scale, stages=STAGES, periods=12):
+    """Time each pipeline stage on one synthetic scale, in order.
+
+    Stages reuse the previous stage's output (features feed training,
+    trained models feed the forecast). Returns a list of result dicts.
+    """
+    import Cube
+    import MapData
+    from Data import LagPanel, load_raw
+    from Forecast import forecast_districts
+    import RF
+    import LGBM
+
+    csv_path = os.path.join(DATA_DIR, f"limao_{scale}.csv")
+    arrow_path = os.path.join(DATA_DIR, f"limao_{scale}.arrow")
+    if not os.path.exists(csv_path):
+        generate(scale, csv_path)
+
+    results, state = [], {}
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        out = fn()
+        results.append({"scale": scale, "stage": stage, "seconds": time.perf_counter() - start,
+                        "peak_rss_mb": _peak_rss_mb()})
+        print(f"{scale:>6} {stage:<10} {results[-1]['seconds']:9.2f} s")
+        return out
+
+    # Ingest selalu dijalankan (tahap lain butuh file Arrow), tapi hanya dicatat jika diminta
+    if "ingest" in stages:
+        timed("ingest", lambda: Ingest.ingest(csv_path, arrow_path))
+    else:
+        Ingest.ensure_dataset(csv_path, arrow_path)
+    raw = load_raw(arrow_path)
+    rows, districts = len(raw), raw["Kabupaten_Kota"].nunique()
+
+    # Fitur lag sebagai LagPanel: matrix float32 hanya dibuat sekali saat training
+    if {"features", "train", "forecast"} & set(stages):
+        state["panel"] = timed("features", lambda: LagPanel(raw)) if "features" in stages else LagPanel(raw)
+
+    if {"train", "forecast"} & set(stages):
+        def train():
+            panel = state["panel"]
+            scaler = panel.fit_scaler()
+            X = panel.matrix(scaler=scaler)
+            return scaler, RF.train_rf(X, panel.y, n_jobs=-1), LGBM.train_lgbm(X, panel.y, verbose=-1)
+        state["models"] = timed("train", train) if "train" in stages else train()
+
+    if "forecast" in stages:
+        scaler, rf_model, lgbm_model = state["models"]
+        timed("forecast", lambda: forecast_districts(raw, state["panel"].features, scaler, rf_model, lgbm_model,
+                                                     periods=periods, clip_negative=True))
+
+    if "aggregate" in stages:
+        timed("aggregate", lambda: Cube.build_cube(raw))
+
+    if "map" in stages:
+        def prepare_map():
+            totals = MapData.production_by_district(raw)
+            ids = MapData.district_names(raw["Kabupaten_Kota"].unique()).to_numpy()
+            return MapData.values_for(ids, totals)
+        timed("map", prepare_map)
+
+    for result in results:
+        result.update(rows=rows, districts=districts)
+    return results
+
+
+# ================================
+# Hasil (JSON per commit)
+# ================================
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(scales=("1x", "10x"), stages=STAGES, out_dir=BENCH_DIR):
+    results = []
+    for scale in scales:
+        results += run_scale(scale, stages)
+
+    report = {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(), "numpy": np.__version__, "pandas": pd.__version__},
+        "results": results,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+    return path
+
+
+# ================================
+# Cold start dashboard
+# ================================
+_STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+seconds = time.perf_counter() - start
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+from Trace import _peak_rss_mb
+print(json.dumps({
+    "seconds": seconds,
+    "peak_rss_mb": _peak_rss_mb(),
+    "modules": sorted(m for m in sys.modules if "." not in m),
+    "errors": [e.value for e in at.exception],
+}))
+"""
+
+
+def startup_check(app="Something.py", budget_s=STARTUP_BUDGET_S, budget_mb=STARTUP_BUDGET_MB):
+    """Render the dashboard's default page once in a fresh interpreter and check the budget.
+
+    Measures time to first render (including the Streamlit import) and peak
+    RSS, and lists forbidden heavy imports. Returns ``(ok, result)``.
+    """
+    out = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT, os.path.abspath(app)],
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    modules = set(result.pop("modules"))
+    result["forbidden"] = [m for m in STARTUP_FORBIDDEN if m in modules]
+    # Tanpa modul resource (Windows) puncak RSS tidak diketahui; hanya waktu yang dicek
+    within_memory = result["peak_rss_mb"] is None or result["peak_rss_mb"] <= budget_mb
+    ok = (result["seconds"] <= budget_s and within_memory
+          and not result["forbidden"] and not result["errors"])
+    return ok, result
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return pd.DataFrame(report["results"]).assign(commit=report["commit"])
+
+
+def compare(old_path, new_path):
+    # Rasio waktu baru / lama per (scale, stage); > 1 berarti lebih lambat
+    old = load_report(old_path).set_index(["scale", "stage"])["seconds"]
+    new = load_report(new_path).set_index(["scale", "stage"])["seconds"]
+    table = pd.DataFrame({"old_s": old, "new_s": new}).dropna()
+    table["ratio"] = table["new_s"] / table["old_s"]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline pada data sintetis skala besar")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Jalankan benchmark dan simpan JSON")
+    p_run.add_argument("--scale", action="append", choices=list(SCALES), help="Bisa diulang (default 1x, 10x)")
+    p_run.add_argument("--stage", action="append", choices=STAGES, help="Bisa diulang (default semua)")
+
+    p_gen = sub.add_parser("generate", help="Tulis data sintetis saja")
+    p_gen.add_argument("scale", choices=list(SCALES))
+    p_gen.add_argument("out")
+
+    p_start = sub.add_parser("startup", help="Cek budget cold start dashboard (exit 1 jika lewat)")
+    p_start.add_argument("--budget-s", type=float, default=STARTUP_BUDGET_S)
+    p_start.add_argument("--budget-mb", type=float, default=STARTUP_BUDGET_MB)
+
+    p_cmp = sub.add_parser("compare", help="Bandingkan dua file hasil")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.scale or ("1x", "10x"), args.stage or STAGES)
+    elif args.command == "generate":
+        print(f"Wrote {generate(args.scale, args.out)} rows to {args.out}")
+    elif args.command == "startup":
+        ok, result = startup_check(budget_s=args.budget_s, budget_mb=args.budget_mb)
+        peak = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.0f} MB"
+        print(f"Overview first render {result['seconds']:.2f} s (budget {args.budget_s} s), "
+              f"peak RSS {peak} (budget {args.budget_mb} MB)")
+        for name in result["forbidden"]:
+            print(f"  heavy import: {name}")
+        for error in result["errors"]:
+            print(f"  error: {error}")
+        sys.exit(0 if ok else 1)
+    else:
+        print(compare(args.old, args.new).round(3).to_string())
@@ -1,23 +1,43 @@
-from RF import y_pred_rf
-from LGBM import y_pred_lgbm
 import numpy as np
-from sklearn.metrics import mean_squared_error
-from Data import X_scaled, X_train_scaled, X_test_scaled, y_train, y_test, smape
 import pandas as pd
+from sklearn.metrics import mean_squared_error
+from Data import smape
+from Train import PREDICTIONS_PATH
+
+# Prediksi test set dari Train.py (tidak ada model yang di-train ulang di sini)
+predictions = pd.read_pickle(PREDICTIONS_PATH)
+y_test = predictions["y_test"].to_numpy()
+y_pred_rf = predictions["RF_Pred"].to_numpy()
+y_pred_lgbm = predictions["LGBM_Pred"].to_numpy()
+
+
+def blend(y_pred_rf, y_pred_lgbm, weight_rf=0.5):
+    return weight_rf * y_pred_rf + (1 - weight_rf) * y_pred_lgbm
+
+
+def optimize_weight(y_true, y_pred_rf, y_pred_lgbm, grid=np.linspace(0, 1, 101)):
+    # Evaluasi semua bobot sekaligus: baris = bobot RF, kolom = sampel
+    blends = grid[:, None] * y_pred_rf + (1 - grid[:, None]) * y_pred_lgbm
+    rmse = np.sqrt(np.mean((blends - y_true) ** 2, axis=1))
+    return grid[np.argmin(rmse)]
 
-# Note: Ensure y_pred_rf and y_pred_lgbm are available from previous steps
 
-# Implement a simple blending approach by averaging the predictions
-# Ensure the predictions are aligned (which they should be if made on the same test set X_test_scaled)
-y_pred_blended = (y_pred_rf + y_pred_lgbm) / 2
+if __name__ == "__main__":
+    # Implement a simple blending approach by averaging the predictions
+    y_pred_blended = blend(y_pred_rf, y_pred_lgbm)
 
-# Calculate RMSE for the blended model
-rmse_blended = np.sqrt(mean_squared_error(y_test, y_pred_blended))
+    # Calculate RMSE and SMAPE for the blended model
+    rmse_blended = np.sqrt(mean_squared_error(y_test, y_pred_blended))
+    smape_blended = smape(y_test, y_pred_blended)
 
-# Calculate SMAPE for the blended model
-smape_blended = smape(y_test, y_pred_blended)
+    # Print the evaluation metrics for the blended model
+    print("Blended Model Evaluation (Random Forest + LightGBM Averaging):")
+    print(f"RMSE: {rmse_blended:.2f}")
+    print(f"SMAPE: {smape_blended:.2f}%")
 
-# Print the evaluation metrics for the blended model
-print("Blended Model Evaluation (Random Forest + LightGBM Averaging):")
-print(f"RMSE: {rmse_blended:.2f}")
-print(f"SMAPE: {smape_blended:.2f}%")
\ No newline at end of file
+    # Bobot optimal (dicari di test set, jadi hanya sebagai pembanding)
+    weight_rf = optimize_weight(y_test, y_pred_rf, y_pred_lgbm)
+    y_pred_weighted = blend(y_pred_rf, y_pred_lgbm, weight_rf)
+    print(f"\nBlended Model Evaluation (weight RF={weight_rf:.2f}, LightGBM={1 - weight_rf:.2f}):")
+    print(f"RMSE: {np.sqrt(mean_squared_error(y_test, y_pred_weighted)):.2f}")
+    print(f"SMAPE: {smape(y_test, y_pred_weighted):.2f}%")
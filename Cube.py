@@ -0,0 +1,96 @@
+import os
+
+import joblib
+import pandas as pd
+
+from Ingest import DATASET_PATH, load_dataset
+
+CACHE_DIR = os.path.join(".cache", "cube")
+CACHE_MAX_ENTRIES = 4       # cube versi data lama (LRU berdasarkan mtime) dihapus di atas batas ini
+
+TARGET = "Produksi_Padi_Ton_clean"
+MEASURES = [TARGET, "Suhu_Rata_C_clean", "Curah_Hujan_mm_clean", "Kelembapan_Persen_clean"]
+CUBE_KEYS = ["Tahun", "Bulan_Ke", "Kabupaten_Kota"]
+
+
+def data_version(path=DATASET_PATH):
+    # Versi data = ukuran + mtime file; berubah setiap kali file diganti
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def build_cube(df):
+    """Aggregate raw rows into a year x month x district cube plus derived views.
+
+    Every view is computed from the cube's sums and counts, so nothing here
+    scales with the raw row count once the cube exists.
+    """
+    df = df.assign(Bulan_Ke=pd.to_datetime(df["Tanggal"]).dt.month)
+
+    grouped = df.groupby(CUBE_KEYS, observed=True)[MEASURES]
+    cells = pd.concat([grouped.sum().add_suffix("_sum"), grouped.count().add_suffix("_count")], axis=1)
+
+    sums = [f"{m}_sum" for m in MEASURES]
+    counts = [f"{m}_count" for m in MEASURES]
+
+    def with_means(frame):
+        for m in MEASURES:
+            frame[f"{m}_mean"] = frame[f"{m}_sum"] / frame[f"{m}_count"]
+        return frame
+
+    by_year = with_means(cells.groupby(level="Tahun")[sums + counts].sum())
+    by_district = with_means(cells.groupby(level="Kabupaten_Kota")[sums + counts].sum())
+    by_district_month = with_means(cells.groupby(level=["Kabupaten_Kota", "Bulan_Ke"])[sums + counts].sum())
+
+    # Input korelasi: rata-rata per kabupaten (sama seperti groupby().mean().corr() sebelumnya)
+    district_means = by_district[[f"{m}_mean" for m in MEASURES]]
+    district_means.columns = MEASURES
+
+    latest_year = int(by_year.index.max())
+    total = cells[f"{TARGET}_sum"].sum()
+    kpi = {
+        "total_produksi": total,
+        "produksi_rata": total / cells[f"{TARGET}_count"].sum(),
+        "kabupaten": by_district.shape[0],
+        "tahun_terakhir": latest_year,
+        "produksi_terakhir": by_year.loc[latest_year, f"{TARGET}_sum"],
+    }
+
+    # Trend produksi tahunan (dipakai halaman Overview dan Trend)
+    trend = by_year[[f"{TARGET}_sum"]].rename(columns={f"{TARGET}_sum": TARGET}).reset_index()
+
+    return {
+        "cells": cells,
+        "trend": trend,
+        "by_year": by_year,
+        "by_district": by_district,
+        "by_district_month": by_district_month,
+        "district_means": district_means,
+        "corr": district_means.corr(),
+        "kpi": kpi,
+    }
+
+
+def load_cube(df=None, path=DATASET_PATH):
+    # Cube disimpan per versi data; rebuild hanya jika file sumber berubah
+    cache_path = os.path.join(CACHE_DIR, f"{data_version(path)}.joblib")
+    if os.path.exists(cache_path):
+        os.utime(cache_path)    # tandai baru dipakai (urutan LRU)
+        return joblib.load(cache_path)
+
+    cube = build_cube(load_dataset(path) if df is None else df)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    joblib.dump(cube, cache_path)
+    evict()
+    return cube
+
+
+def evict(max_entries=CACHE_MAX_ENTRIES, cache_dir=CACHE_DIR):
+    # Hapus cube yang paling lama tidak dipakai sampai tersisa max_entries
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".joblib")]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[max_entries:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
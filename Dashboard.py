@@ -0,0 +1,76 @@
+import streamlit as st
+
+import Cube
+import PlotData
+import Store
+
+# Bagian bersama semua halaman dashboard (views/*.py). Hanya dependensi ringan di sini;
+# plotly dan library lain di-import oleh halaman yang memakainya.
+
+
+# ====== Load Data ======
+def load_data():
+    # Dataset kolumnar (Arrow IPC, memory-mapped); dibuat dari Limao.csv oleh Ingest.py.
+    # Store memuatnya sekali per proses server dan membaginya (read-only) ke semua sesi.
+    return Store.frame("limao")
+
+
+# Aggregate cube: dibangun sekali per versi data, dibagi ke semua sesi
+@st.cache_resource
+def _load_cube(version):
+    return Cube.load_cube(load_data())
+
+
+def load_cube():
+    return _load_cube(Store.version("limao"))
+
+
+def render_mode():
+    # Pilihan "Mode plot" di sidebar (lihat Something.py)
+    return PlotData.RENDER_MODES[st.session_state.get("render_mode", next(iter(PlotData.RENDER_MODES)))]
+
+
+# Scatter & boxplot: mode ringkas hanya mengirim grid / statistik ke browser, bukan setiap baris
+@st.cache_resource
+def _scatter_figure(version, x, y, mode):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    data = load_data()
+    if not PlotData.use_binned(len(data), mode):
+        return px.scatter(data, x=x, y=y, color="Kabupaten_Kota", opacity=0.6)
+
+    x_centers, y_centers, counts = PlotData.bin_2d(data[x], data[y])
+    fig = go.Figure(go.Heatmap(x=x_centers, y=y_centers, z=counts, colorscale="Blues",
+                               colorbar={"title": "Jumlah"},
+                               hovertemplate=f"{x}: %{{x:.2f}}<br>{y}: %{{y:,.0f}}<br>Jumlah: %{{z}}<extra></extra>"))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+@st.cache_resource
+def _box_figure(version, y, mode):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    data = load_data()
+    if not PlotData.use_binned(len(data), mode):
+        return px.box(data, y=y, points="all")
+
+    stats = PlotData.box_stats(data[y])
+    fig = go.Figure(go.Box(x=[y], q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+                           lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+                           mean=[stats["mean"]], name=y, boxpoints=False))
+    fig.add_trace(go.Scatter(x=[y] * len(stats["outliers"]), y=stats["outliers"], mode="markers",
+                             marker={"size": 4, "opacity": 0.6},
+                             name=f"Outlier ({len(stats['outliers'])} dari {stats['n_outliers']})"))
+    fig.update_layout(yaxis_title=y, showlegend=True)
+    return fig
+
+
+def scatter_figure(x, y):
+    return _scatter_figure(Store.version("limao"), x, y, render_mode())
+
+
+def box_figure(y):
+    return _box_figure(Store.version("limao"), y, render_mode())
@@ -0,0 +1,199 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from Data import CLIMATE_COLS, LAG_WINDOW, TARGET, load_raw, prepare_dataset
+from Forecast import FeatureLayout, LagState, forecast_districts
+from Backtest import summarize
+
+MODES = ("recursive", "direct")
+
+
+# ================================
+# Dataset per horizon
+# ================================
+def direct_features(features):
+    # Iklim bulan berjalan belum diketahui saat origin, jadi tidak dipakai model direct
+    return [f for f in features if f not in CLIMATE_COLS]
+
+
+def _target_month(dates, h):
+    return (pd.DatetimeIndex(dates) + pd.DateOffset(months=h - 1)).month.to_numpy()
+
+
+def _with_target_season(X, months):
+    X = X.copy()
+    if "Month_sin" in X.columns:
+        X["Month_sin"] = np.sin(2 * np.pi * months / 12)
+    if "Month_cos" in X.columns:
+        X["Month_cos"] = np.cos(2 * np.pi * months / 12)
+    return X
+
+
+def horizon_frame(df, raw, features, h, origin=None):
+    """Training rows for horizon ``h`` (1 = first forecast month).
+
+    Features are the lags known at the origin month t (as built by Data.py),
+    with the seasonal terms of the target month; the target is production at
+    t + h - 1. With ``origin``, only targets before it are kept.
+    """
+    cols = direct_features(features)
+    target = raw[["Kabupaten_Kota", "Tanggal", TARGET]].rename(columns={TARGET: "y"})
+    target["Tanggal"] = target["Tanggal"] - pd.DateOffset(months=h - 1)
+    target["Target_Tanggal"] = target["Tanggal"] + pd.DateOffset(months=h - 1)
+
+    frame = df[["Kabupaten_Kota", "Tanggal"] + cols].merge(target, on=["Kabupaten_Kota", "Tanggal"], how="inner")
+    if origin is not None:
+        frame = frame[frame["Target_Tanggal"] < origin]
+
+    X = _with_target_season(frame[cols], _target_month(frame["Tanggal"], h))
+    return X, frame["y"]
+
+
+def origin_matrix(history, features, origin, W=None):
+    # Fitur di bulan origin untuk semua kabupaten, dari lag state riwayat sebelum origin
+    districts = history["Kabupaten_Kota"].unique()
+    layout = FeatureLayout(features, W=W)
+    state = LagState.from_history(history, districts, window=max(LAG_WINDOW, layout.max_lag))
+    X = pd.DataFrame(layout.assemble(state, origin.month), columns=layout.features)
+    return districts, X[direct_features(features)]
+
+
+# ================================
+# Training + prediksi per horizon (paralel)
+# ================================
+def _fit_horizon(args):
+    h, origin = args
+    import RF
+    import LGBM
+
+    data = prepare_dataset()
+    raw = load_raw()
+    history = raw[raw["Tanggal"] < origin]
+
+    # Model pohon tidak butuh scaling, jadi fitur dipakai apa adanya
+    X_train, y_train = horizon_frame(data["df"], raw, data["features"], h, origin)
+    rf_model = RF.train_rf(X_train, y_train, n_jobs=1)
+    lgbm_model = LGBM.train_lgbm(X_train, y_train, n_jobs=1, verbose=-1)
+
+    districts, X0 = origin_matrix(history, data["features"], origin, _weights(history, data["config"]))
+    X = _with_target_season(X0, np.full(len(X0), _target_month([origin], h)[0]))
+    return h, districts, rf_model.predict(X), lgbm_model.predict(X)
+
+
+def _weights(history, config):
+    if config.get("spatial") is None:
+        return None
+    from Spatial import weights_for
+    return weights_for(history, config["spatial"])[1]
+
+
+def _default_origin():
+    return load_raw()["Tanggal"].max() + pd.offsets.MonthBegin()
+
+
+def forecast_direct(origin=None, periods=12, clip_negative=True, max_workers=None):
+    """Train one RF + LightGBM pair per horizon and predict every horizon in parallel.
+
+    No prediction is fed back as a lag, so horizons are independent and run
+    in a process pool. Output has the same layout as ``forecast_districts``.
+    """
+    origin = pd.Timestamp(origin) if origin is not None else _default_origin()
+    prepare_dataset()   # feature cache siap sebelum worker dibuat
+
+    tasks = [(h, origin) for h in range(1, periods + 1)]
+    with ProcessPoolExecutor(max_workers=max_workers or min(periods, os.cpu_count())) as pool:
+        results = sorted(pool.map(_fit_horizon, tasks), key=lambda r: r[0])
+
+    districts = results[0][1]
+    pred_rf = np.array([r[2] for r in results])
+    pred_lgbm = np.array([r[3] for r in results])
+    pred_blend = (pred_rf + pred_lgbm) / 2
+    if clip_negative:
+        pred_rf, pred_lgbm, pred_blend = (np.maximum(p, 0) for p in (pred_rf, pred_lgbm, pred_blend))
+
+    dates = pd.date_range(origin, periods=periods, freq="MS")
+    return pd.DataFrame({
+        "Kabupaten_Kota": np.repeat(districts, periods),
+        "Tanggal": np.tile(dates, len(districts)),
+        "RF_Pred": pred_rf.T.ravel(),
+        "LGBM_Pred": pred_lgbm.T.ravel(),
+        "Blended_Pred": pred_blend.T.ravel(),
+    })
+
+
+def forecast_recursive(origin=None, periods=12, clip_negative=True):
+    # Recursive: satu pasang model, prediksi bulan h dimasukkan sebagai lag untuk h+1
+    import RF
+    import LGBM
+
+    origin = pd.Timestamp(origin) if origin is not None else _default_origin()
+    data = prepare_dataset()
+    df, features = data["df"], data["features"]
+    raw = load_raw()
+    history = raw[raw["Tanggal"] < origin]
+
+    train = df[df["Tanggal"] < origin]
+    scaler = MinMaxScaler()
+    X_train = scaler.fit_transform(train[features])
+    rf_model = RF.train_rf(X_train, train[TARGET], n_jobs=-1)
+    lgbm_model = LGBM.train_lgbm(X_train, train[TARGET], verbose=-1)
+
+    return forecast_districts(history, features, scaler, rf_model, lgbm_model, periods=periods,
+                              clip_negative=clip_negative, W=_weights(history, data["config"]))
+
+
+def forecast(mode="recursive", origin=None, periods=12, clip_negative=True, max_workers=None):
+    if mode == "recursive":
+        return forecast_recursive(origin, periods, clip_negative)
+    if mode == "direct":
+        return forecast_direct(origin, periods, clip_negative, max_workers)
+    raise ValueError(f"Mode '{mode}' tidak dikenal, pilih salah satu dari {MODES}")
+
+
+# ================================
+# Perbandingan recursive vs direct
+# ================================
+def compare(origin="2024-01-01", periods=12, modes=MODES, max_workers=None):
+    """Train and forecast from ``origin`` with each mode, timed end to end.
+
+    Returns ``(summary, results)``: ``summary`` has one row per mode with
+    wall time and Backtest-style RMSE/SMAPE against the actuals, and
+    ``results`` maps mode -> predictions with ``horizon`` and ``Actual``.
+    """
+    origin = pd.Timestamp(origin)
+    raw = load_raw()
+    actual = raw[["Kabupaten_Kota", "Tanggal", TARGET]].rename(columns={TARGET: "Actual"})
+
+    rows, results = {}, {}
+    for mode in modes:
+        start = time.perf_counter()
+        pred = forecast(mode, origin, periods, max_workers=max_workers)
+        seconds = time.perf_counter() - start
+
+        pred["horizon"] = np.tile(np.arange(1, periods + 1), len(pred) // periods)
+        result = pred.merge(actual, on=["Kabupaten_Kota", "Tanggal"], how="inner")
+        results[mode] = result
+        rows[mode] = pd.concat([pd.Series({"seconds": seconds}), summarize(result)])
+
+    return pd.DataFrame(rows).T, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan forecast recursive dan direct multi-horizon")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--origin", default="2024-01-01", help="Bulan pertama yang diprediksi")
+    parser.add_argument("--periods", type=int, default=12)
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    summary, results = compare(args.origin, args.periods, modes)
+    print(summary.round(2).to_string())
+    for mode, result in results.items():
+        print(f"\n{mode}: Blended RMSE per horizon")
+        print(summarize(result, by="horizon")["Blended_RMSE"].round(1).to_string())
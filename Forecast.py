@@ -0,0 +1,358 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from Data import DRIVERS, LAG_WINDOW
+from TreeInfer import compile_rf
+import Trace
+
+_LAG_RE = re.compile(r"^(?P<driver>.+)_lag_(?P<lag>\d+)$")
+_SPLAG_RE = re.compile(r"^(?P<driver>.+)_splag_(?P<lag>\d+)$")
+
+
+# ================================
+# Lag state (ring buffer) per Kabupaten/Kota
+# ================================
+class LagState:
+    """Last ``window`` values of every driver for every series, as a ring buffer.
+
+    ``buffer`` has shape (n_series, n_drivers, window). ``head`` is the slot of
+    the most recent value (lag 1); pushing a new month only moves ``head`` and
+    overwrites one slot, so advancing the state is O(n_series) regardless of
+    how long the history is.
+    """
+
+    def __init__(self, buffer, head):
+        self.buffer = buffer
+        self.head = head
+
+    @property
+    def window(self):
+        return self.buffer.shape[2]
+
+    @classmethod
+    def from_history(cls, df, series, window=LAG_WINDOW, drivers=DRIVERS):
+        # Ambil `window` row terakhir tiap kabupaten (urutan row = urutan waktu)
+        grouped = df.groupby("Kabupaten_Kota", sort=False)
+        age = grouped.cumcount(ascending=False).to_numpy()  # 0 = bulan terakhir
+        keep = age < window
+
+        series_idx = pd.Index(series).get_indexer(df["Kabupaten_Kota"].to_numpy()[keep])
+        slot = window - 1 - age[keep]
+
+        buffer = np.full((len(series), len(drivers), window), np.nan)
+        values = df[drivers].to_numpy(dtype=float)[keep]
+        buffer[series_idx[:, None], np.arange(len(drivers)), slot[:, None]] = values
+        return cls(buffer, head=window - 1)
+
+    def lag(self, driver_idx, lag):
+        # Nilai driver `lag` bulan ke belakang untuk semua series
+        return self.buffer[:, driver_idx, (self.head - lag + 1) % self.window]
+
+    def push(self, values):
+        # values: (n_series, n_drivers) untuk bulan yang baru diprediksi
+        self.head = (self.head + 1) % self.window
+        self.buffer[:, :, self.head] = values
+
+
+class FeatureLayout:
+    """Maps the names in ``features.pkl`` onto the lag state.
+
+    Parsed once; ``assemble`` then fills the feature matrix for one step with
+    a couple of fancy-indexing gathers instead of rebuilding lag columns.
+    Spatial lags (``*_splag_*``) need the district weight matrix ``W``, in the
+    same district order as the state.
+    """
+
+    def __init__(self, features, drivers=DRIVERS, W=None):
+        self.features = list(features)
+        self.drivers = list(drivers)
+        self.W = W
+
+        lag_pos, lag_driver, lag_n = [], [], []
+        sp_pos, sp_driver, sp_n = [], [], []
+        current_pos, current_driver = [], []
+        self.sin_pos = self.cos_pos = None
+
+        for pos, name in enumerate(self.features):
+            lag_match = _LAG_RE.match(name)
+            sp_match = _SPLAG_RE.match(name)
+            if lag_match and lag_match.group("driver") in self.drivers:
+                lag_pos.append(pos)
+                lag_driver.append(self.drivers.index(lag_match.group("driver")))
+                lag_n.append(int(lag_match.group("lag")))
+            elif sp_match and sp_match.group("driver") in self.drivers:
+                sp_pos.append(pos)
+                sp_driver.append(self.drivers.index(sp_match.group("driver")))
+                sp_n.append(int(sp_match.group("lag")))
+            elif name in self.drivers:
+                current_pos.append(pos)
+                current_driver.append(self.drivers.index(name))
+            elif name == "Month_sin":
+                self.sin_pos = pos
+            elif name == "Month_cos":
+                self.cos_pos = pos
+            else:
+                raise ValueError(f"Fitur '{name}' tidak dikenali oleh FeatureLayout")
+
+        self.lag_pos = np.array(lag_pos, dtype=int)
+        self.lag_driver = np.array(lag_driver, dtype=int)
+        self.lag_n = np.array(lag_n, dtype=int)
+        self.current_pos = np.array(current_pos, dtype=int)
+        self.current_driver = np.array(current_driver, dtype=int)
+        self.sp_pos = np.array(sp_pos, dtype=int)
+        self.sp_driver = np.array(sp_driver, dtype=int)
+        self.sp_n = np.array(sp_n, dtype=int)
+        self.max_lag = int(max(lag_n + sp_n, default=1))
+
+        if len(self.sp_pos) and W is None:
+            raise ValueError("Fitur spatial lag butuh matriks bobot W (lihat Spatial.py)")
+
+    def assemble(self, state, month, current=None):
+        # current: (n_series, n_drivers) nilai bulan berjalan; default NaN (belum diketahui)
+        n_series = state.buffer.shape[0]
+        X = np.empty((n_series, len(self.features)))
+
+        slots = (state.head - self.lag_n + 1) % state.window
+        X[:, self.lag_pos] = state.buffer[:, self.lag_driver, slots]
+
+        if len(self.sp_pos):
+            sp_slots = (state.head - self.sp_n + 1) % state.window
+            X[:, self.sp_pos] = self.W @ state.buffer[:, self.sp_driver, sp_slots]
+
+        if current is None:
+            X[:, self.current_pos] = np.nan
+        else:
+            X[:, self.current_pos] = current[:, self.current_driver]
+
+        if self.sin_pos is not None:
+            X[:, self.sin_pos] = np.sin(2 * np.pi * month / 12)
+        if self.cos_pos is not None:
+            X[:, self.cos_pos] = np.cos(2 * np.pi * month / 12)
+        return X
+
+
+# ================================
+# Recursive forecast untuk semua Kabupaten/Kota sekaligus
+# ================================
+def band_column(model, q):
+    # Nama kolom band prediksi, mis. RF_Q10 / LGBM_Q90
+    return f"{model}_Q{round(q * 100):02d}"
+
+
+@Trace.traced("forecast")
+def forecast_districts(df, features, scaler, rf_model, lgbm_model, periods=12, clip_negative=False, W=None,
+                       quantiles=None, lgbm_quantile_models=None, progress=None):
+    """Forecast all districts together, one horizon step at a time.
+
+    The lag features for each step are read from a per-district ``LagState``
+    in ``features.pkl`` order, then a single batched ``scaler.transform`` and
+    one ``predict`` per model run over every district. The blended prediction
+    is pushed back into the state so the next step's lags see it, exactly like
+    the old per-district loop. Cost is linear in ``periods``.
+
+    ``scaler`` may be None for models compiled by ``TreeInfer`` with the
+    scaler folded into their thresholds; raw features are then passed as is.
+
+    ``W`` is only needed when ``features`` include spatial lags; its rows must
+    follow the order of ``df["Kabupaten_Kota"].unique()`` (see
+    ``Spatial.weights_for``).
+
+    With ``quantiles`` (e.g. ``(0.1, 0.9)``), every step also takes the
+    per-tree outputs of the RF for the whole batch in one gather (see
+    ``TreeInfer``) and adds ``RF_Q10``/``RF_Q90``-style band columns. The
+    bands describe the spread of the forest given the blended path; they are
+    not propagated through the recursion. ``lgbm_quantile_models`` maps a
+    quantile to a LightGBM quantile model and adds matching ``LGBM_Q*``
+    columns.
+
+    ``progress``, if given, is called as ``progress(step, periods)`` after
+    every completed step.
+
+    Returns one row per (Kabupaten_Kota, Tanggal) with RF_Pred, LGBM_Pred and
+    Blended_Pred (plus band columns), ordered by district then date.
+    """
+    districts = df["Kabupaten_Kota"].unique()
+    n_districts = len(districts)
+
+    last_date = df["Tanggal"].max()
+    future_dates = pd.date_range(start=last_date + pd.offsets.MonthBegin(),
+                                 periods=periods, freq="MS")
+
+    layout = FeatureLayout(features, W=W)
+    state = LagState.from_history(df, districts, window=max(LAG_WINDOW, layout.max_lag))
+
+    pred_rf = np.empty((periods, n_districts))
+    pred_lgbm = np.empty((periods, n_districts))
+    pred_blend = np.empty((periods, n_districts))
+
+    quantiles = list(quantiles or [])
+    lgbm_quantile_models = dict(lgbm_quantile_models or {})
+    # Model hasil TreeInfer bisa langsung memberi output per pohon; RF sklearn dikompilasi sekali
+    rf_trees = None
+    if quantiles:
+        rf_trees = rf_model if hasattr(rf_model, "predict_trees") else compile_rf(rf_model)
+    bands = {band_column("RF", q): np.empty((periods, n_districts)) for q in quantiles}
+    bands.update({band_column("LGBM", q): np.empty((periods, n_districts)) for q in lgbm_quantile_models})
+
+    # Bulan prediksi: iklim belum diketahui (NaN), target diisi hasil blended
+    pushed = np.full((n_districts, len(DRIVERS)), np.nan)
+    # Model yang di-fit dengan DataFrame (Train.py) diberi DataFrame, model dari ndarray
+    # (Backtest, Direct, Bench) tetap ndarray, supaya sklearn tidak memberi warning nama fitur
+    named_inputs = hasattr(rf_model, "feature_names_in_")
+
+    for step, date in enumerate(future_dates):
+        with Trace.span("forecast.step", step=step + 1):
+            X_step = layout.assemble(state, date.month)
+            if scaler is None:
+                X_step_scaled = X_step      # model hasil TreeInfer dengan scaler sudah di-fold
+            else:
+                X_step_scaled = scaler.transform(pd.DataFrame(X_step, columns=layout.features, copy=False))
+                if named_inputs:
+                    X_step_scaled = pd.DataFrame(X_step_scaled, columns=layout.features)
+
+            # Satu predict per model untuk semua kabupaten
+            with Trace.span("predict.rf"):
+                if rf_trees is rf_model:
+                    per_tree = rf_model.predict_trees(X_step_scaled)
+                    y_rf = per_tree.mean(axis=0)    # sama persis dengan CompiledEnsemble.predict
+                else:
+                    y_rf = rf_model.predict(X_step_scaled)
+                    per_tree = rf_trees.predict_trees(X_step_scaled) if rf_trees is not None else None
+            with Trace.span("predict.lgbm"):
+                y_lgbm = lgbm_model.predict(X_step_scaled)
+            y_blend = (y_rf + y_lgbm) / 2
+
+            if quantiles:
+                for q, band in zip(quantiles, np.quantile(per_tree, quantiles, axis=0)):
+                    bands[band_column("RF", q)][step] = band
+            for q, model in lgbm_quantile_models.items():
+                bands[band_column("LGBM", q)][step] = model.predict(X_step_scaled)
+
+            if clip_negative:
+                y_rf = np.maximum(y_rf, 0)
+                y_lgbm = np.maximum(y_lgbm, 0)
+                y_blend = np.maximum(y_blend, 0)
+                for band in bands.values():
+                    np.maximum(band[step], 0, out=band[step])
+
+            pred_rf[step] = y_rf
+            pred_lgbm[step] = y_lgbm
+            pred_blend[step] = y_blend
+
+            # Masukkan hasil prediksi ke state (pakai blended untuk update lag)
+            pushed[:, 0] = y_blend
+            state.push(pushed)
+        if progress is not None:
+            progress(step + 1, periods)
+
+    return pd.DataFrame({
+        "Kabupaten_Kota": np.repeat(districts, periods),
+        "Tanggal": np.tile(future_dates, n_districts),
+        "RF_Pred": pred_rf.T.ravel(),
+        "LGBM_Pred": pred_lgbm.T.ravel(),
+        "Blended_Pred": pred_blend.T.ravel(),
+        **{name: band.T.ravel() for name, band in bands.items()},
+    })
+
+
+# ================================
+# Hierarki: kabupaten/kota -> provinsi dalam satu run
+# ================================
+PRED_COLS = ["RF_Pred", "LGBM_Pred", "Blended_Pred"]
+BAND_QUANTILES = (0.1, 0.9)
+PROVINCE_PATH = "1YPrediction.csv"
+DISTRICT_PATH = "1YPrediction_K.csv"
+_BAND_RE = re.compile(r"^(?P<model>.+)_Q\d{2}$")
+
+
+def band_columns(frame):
+    return [col for col in frame.columns if _BAND_RE.match(col)]
+
+
+def aggregate_province(district_predictions, cols=None):
+    # Total provinsi per bulan = jumlah semua kabupaten/kota (bottom-up, selalu koheren).
+    # Band ikut dijumlah: batas konservatif (anggap semua kabupaten meleset searah).
+    if cols is None:
+        cols = PRED_COLS + band_columns(district_predictions)
+    return district_predictions.groupby("Tanggal")[cols].sum().reset_index()
+
+
+def reconcile(district_predictions, province_target, cols=PRED_COLS):
+    """Scale district forecasts so every month sums to a province-level target.
+
+    ``province_target`` has a ``Tanggal`` column plus ``cols`` (the layout of
+    ``1YPrediction.csv``). Each district keeps its share of the bottom-up
+    total; months whose bottom-up total is zero are split evenly. Months
+    missing from the target are left unchanged.
+    """
+    out = district_predictions.copy()
+    dates = out["Tanggal"]
+    values = out[cols].to_numpy(dtype=float)
+
+    totals = out.groupby("Tanggal")[cols].transform("sum").to_numpy()
+    counts = out.groupby("Tanggal")["Tanggal"].transform("size").to_numpy()[:, None]
+    target = province_target.set_index("Tanggal")[cols].reindex(dates).to_numpy(dtype=float)
+
+    share = np.where(totals != 0, values / np.where(totals != 0, totals, 1), 1 / counts)
+    out[cols] = np.where(np.isnan(target), values, share * target)
+
+    # Band ikut diskalakan dengan faktor yang sama seperti prediksi model-nya
+    for band in band_columns(out):
+        pred = f"{_BAND_RE.match(band).group('model')}_Pred"
+        if pred in cols:
+            before = district_predictions[pred].to_numpy(dtype=float)
+            factor = np.where(before != 0, out[pred].to_numpy() / np.where(before != 0, before, 1), 1)
+            out[band] = out[band].to_numpy() * factor
+    return out
+
+
+def forecast_hierarchy(df, features, scaler, rf_model, lgbm_model, periods=12, clip_negative=True,
+                       W=None, province_target=None, quantiles=BAND_QUANTILES, lgbm_quantile_models=None):
+    """Run the district forecast once and derive the province totals from it.
+
+    Negative district forecasts are clipped by default, and the province
+    rows are their sums, so both levels always agree. With
+    ``province_target``, districts are first reconciled to it (see
+    ``reconcile``). Band columns (see ``forecast_districts``) are added for
+    ``quantiles``. Returns ``(district_predictions, province_predictions)``.
+    """
+    districts = forecast_districts(df, features, scaler, rf_model, lgbm_model, periods=periods,
+                                   clip_negative=clip_negative, W=W, quantiles=quantiles,
+                                   lgbm_quantile_models=lgbm_quantile_models)
+    if province_target is not None:
+        districts = reconcile(districts, province_target)
+    return districts, aggregate_province(districts)
+
+
+def write_forecasts(periods=12, clip_negative=True, province_target=None, quantiles=BAND_QUANTILES,
+                    district_path=DISTRICT_PATH, province_path=PROVINCE_PATH):
+    # Forecast malam: satu pass, kedua CSV ditulis dari hasil yang sama
+    import Artifacts
+    from Data import prepare_dataset
+
+    store = Artifacts.open_store()
+    districts, province = forecast_hierarchy(prepare_dataset()["df"], store.features, None, store.rf, store.lgbm,
+                                             periods=periods, clip_negative=clip_negative,
+                                             province_target=province_target, quantiles=quantiles,
+                                             lgbm_quantile_models=store.lgbm_quantiles)
+    districts.to_csv(district_path, index=False)
+    province.to_csv(province_path, index=False)
+    print(f"Saved {district_path} and {province_path} (artifacts {store.version})")
+    return districts, province
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Prediksi produksi padi per kabupaten/kota dan total provinsi")
+    parser.add_argument("--periods", type=int, default=12, help="Jumlah bulan ke depan")
+    parser.add_argument("--no-clip", action="store_true", help="Jangan potong prediksi negatif ke 0")
+    parser.add_argument("--province-target", help="CSV target provinsi (format 1YPrediction.csv) untuk rekonsiliasi")
+    args = parser.parse_args()
+
+    target = None
+    if args.province_target:
+        target = pd.read_csv(args.province_target, parse_dates=["Tanggal"])
+    write_forecasts(args.periods, not args.no_clip, target)
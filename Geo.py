@@ -1,38 +1,151 @@
-import geopandas as gpd
-import fiona
+import argparse
+import os
+import re
+import shutil
+from functools import lru_cache
 
-# ==== 1. Path ke file GDB ====
+import pyogrio
+import shapely
+
+# ==== 1. Konfigurasi ====
 gdb_path = "Kotaw.gdb"  # ganti sesuai nama folder GDB kamu
+LAYER = "ADMINISTRASI_AR_KABKOTA"
+PROVINCE_FIELD = "WADMPR"   # nama provinsi (skema RBI)
+NAME_FIELD = "WADMKK"       # nama kabupaten/kota
+OUTPUT_DIR = "boundaries"
+MAIN_OUTPUT = "Main.geojson"
+
+# Toleransi simplifikasi (derajat). "full" = geometri asli.
+TOLERANCES = {"full": 0, "high": 0.0005, "medium": 0.002, "low": 0.01}
+MAIN_LEVEL = "medium"
+COORDINATE_PRECISION = 5    # ~1 m, cukup untuk peta dashboard
+
+
+# ==== 2. Cari kolom provinsi & nama (hanya dari sampel kecil) ====
+@lru_cache(maxsize=4)
+def _sample_attributes(path, layer, sample):
+    # Atribut beberapa fitur pertama saja, tanpa geometri
+    return pyogrio.read_dataframe(path, layer=layer, read_geometry=False, max_features=sample)
+
+
+def find_province_field(path=gdb_path, layer=LAYER, text="JAWA TIMUR", sample=200):
+    fields = pyogrio.read_info(path, layer=layer)["fields"]
+    if PROVINCE_FIELD in fields:
+        return PROVINCE_FIELD
+
+    # Skema berbeda: cek isi atribut dari sampel
+    df = _sample_attributes(path, layer, sample)
+    for col in df.columns:
+        if df[col].astype(str).str.contains(text, case=False, na=False).any():
+            return col
+    raise ValueError(f"❌ Tidak ditemukan kolom dengan teks '{text}'. Cek isi atribut tabel!")
+
+
+def find_name_field(path=gdb_path, layer=LAYER, province_field=PROVINCE_FIELD, sample=200):
+    fields = pyogrio.read_info(path, layer=layer)["fields"]
+    if NAME_FIELD in fields:
+        return NAME_FIELD
+
+    # Skema berbeda: kolom (selain provinsi) yang paling sering berisi "Kota ..."/"Kab ..." di sampel
+    df = _sample_attributes(path, layer, sample)
+    pattern = r"^\s*(?:KOTA|KAB)"
+    scores = {col: df[col].astype(str).str.contains(pattern, case=False, na=False).mean()
+              for col in df.columns if col != province_field}
+    best = max(scores, key=scores.get, default=None)
+    if best is None or scores[best] == 0:
+        raise ValueError("❌ Tidak ditemukan kolom nama kabupaten/kota. Cek isi atribut tabel!")
+    return best
+
+
+# ==== 3. Baca hanya fitur provinsi yang diminta ====
+def _sql_string(text):
+    # Isi literal string OGR SQL: tanda kutip tunggal digandakan, jadi input tidak bisa keluar dari string
+    return str(text).replace("'", "''")
+
+
+def read_provinces(provinces=None, path=gdb_path, layer=LAYER, bbox=None):
+    province_field = find_province_field(path, layer)
+    name_field = find_name_field(path, layer, province_field)
+
+    # Filter di level reader (OGR SQL), jadi fitur lain tidak pernah di-decode
+    where = None
+    if provinces:
+        clauses = [f"UPPER({province_field}) LIKE '%{_sql_string(p.upper())}%'" for p in provinces]
+        where = " OR ".join(clauses)
+
+    gdf = pyogrio.read_dataframe(path, layer=layer, columns=[province_field, name_field],
+                                 where=where, bbox=bbox)
+    gdf = gdf.rename(columns={province_field: "province"})
+
+    # Satu fitur per kabupaten/kota, nama disamakan dengan Limao.csv
+    gdf = gdf.dissolve(by=["province", name_field], as_index=False)
+    gdf["name"] = gdf[name_field].str.title().where(
+        gdf[name_field].str.upper().str.startswith("KOTA"),
+        "Kabupaten " + gdf[name_field].str.title(),
+    )
+    return gdf
+
+
+# ==== 4. Simplifikasi yang menjaga topologi (batas antar kabupaten tetap berimpit) ====
+def simplify(gdf, tolerance):
+    if tolerance <= 0:
+        return gdf
+    out = gdf.copy()
+    # coverage_simplify menyederhanakan tiap batas bersama satu kali, jadi tidak ada gap/overlap
+    out.geometry = shapely.coverage_simplify(gdf.geometry.values, tolerance)
+    return out
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def write_outputs(gdf, out_dir=OUTPUT_DIR, tolerances=TOLERANCES):
+    os.makedirs(out_dir, exist_ok=True)
+    written = {province: {} for province in gdf["province"].unique()}
+    for level, tolerance in tolerances.items():
+        # Simplifikasi seluruh coverage sekaligus, baru dipecah per provinsi,
+        # supaya batas antar provinsi juga tetap konsisten
+        simplified = simplify(gdf, tolerance)
+        for province, part in simplified.groupby("province"):
+            path = os.path.join(out_dir, f"{slugify(province)}_{level}")
+
+            # GeoJSON dengan koordinat dikuantisasi + GeoParquet untuk konsumen Python
+            pyogrio.write_dataframe(part, f"{path}.geojson", driver="GeoJSON",
+                                    layer_options={"COORDINATE_PRECISION": COORDINATE_PRECISION,
+                                                   "RFC7946": "YES"})
+            part.to_parquet(f"{path}.parquet")
+            written[province][level] = f"{path}.geojson"
+    return written
 
-# ==== 2. Cek semua layer ====
-layers = fiona.listlayers(gdb_path)
-print("Layer yang tersedia:", layers)
 
-# ==== 3. Baca layer kabupaten/kota ====
-# (dari hasil listlayers biasanya 'ADMINISTRASI_AR_KABKOTA')
-gdf = gpd.read_file(gdb_path, layer="ADMINISTRASI_AR_KABKOTA")
+# ==== 5. Ekstraksi: satu kali baca untuk semua provinsi ====
+def extract(provinces=("JAWA TIMUR",), out_dir=OUTPUT_DIR, bbox=None):
+    gdf = read_provinces(provinces, bbox=bbox)
+    if gdf.empty:
+        raise ValueError(f"❌ Tidak ada fitur untuk provinsi {provinces}")
 
-print("\nKolom yang tersedia di layer:")
-print(gdf.columns)
+    if gdf.crs is not None and not gdf.crs.equals("EPSG:4326"):
+        gdf = gdf.to_crs("EPSG:4326")
 
-# ==== 4. Cari kolom yang mengandung 'JAWA TIMUR' ====
-target_col = None
-for col in gdf.columns:
-    if gdf[col].astype(str).str.contains("JAWA TIMUR", case=False, na=False).any():
-        target_col = col
-        break
+    for province, count in gdf["province"].value_counts().sort_index().items():
+        print(f"{province}: {count} kabupaten/kota")
+    return write_outputs(gdf, out_dir)
 
-if target_col is None:
-    raise ValueError("❌ Tidak ditemukan kolom dengan teks 'JAWA TIMUR'. Cek isi atribut tabel!")
 
-print(f"\nKolom yang dipakai untuk filter: {target_col}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstrak batas kabupaten/kota dari Kotaw.gdb")
+    parser.add_argument("--province", action="append", help="Nama provinsi (bisa diulang)")
+    parser.add_argument("--all", action="store_true", help="Ekstrak semua provinsi sekaligus")
+    args = parser.parse_args()
 
-# ==== 5. Filter hanya Jawa Timur ====
-gdf_jatim = gdf[gdf[target_col].str.contains("JAWA TIMUR", case=False, na=False)]
+    print("Layer yang tersedia:", [name for name, _ in pyogrio.list_layers(gdb_path)])
 
-print(f"Jumlah fitur Jawa Timur: {len(gdf_jatim)}")
+    provinces = None if args.all else (args.province or ["JAWA TIMUR"])
+    outputs = extract(provinces)
 
-# ==== 6. Simpan ke GeoJSON ====
-output_file = "Main.geojson"
-gdf_jatim.to_file(output_file, driver="GeoJSON")
-print(f"✅ Data Jawa Timur berhasil disimpan ke {output_file}")
+    # ==== 6. Main.geojson untuk dashboard (Jawa Timur, versi simplified) ====
+    for province, files in outputs.items():
+        if "JAWA TIMUR" in str(province).upper():
+            shutil.copyfile(files[MAIN_LEVEL], MAIN_OUTPUT)
+            print(f"✅ Data Jawa Timur berhasil disimpan ke {MAIN_OUTPUT}")
@@ -0,0 +1,182 @@
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.feather as feather
+
+import Trace
+
+CSV_PATH = "Limao.csv"
+DATASET_PATH = "Limao.arrow"
+
+# Skema Limao.csv: kategori untuk kabupaten & bulan, float32 untuk ukuran iklim.
+# Produksi tetap float64: nilai ratusan ribu ton dengan 2 desimal tidak muat di float32.
+SCHEMA = pa.schema([
+    ("Tanggal", pa.timestamp("ns")),
+    ("Tahun", pa.int16()),
+    ("Bulan", pa.dictionary(pa.int8(), pa.string())),
+    ("Kabupaten_Kota", pa.dictionary(pa.int16(), pa.string())),
+    ("Latitude_dd", pa.float32()),
+    ("Longitude_dd", pa.float32()),
+    ("Produksi_Padi_Ton_clean", pa.float64()),
+    ("Suhu_Rata_C_clean", pa.float32()),
+    ("Curah_Hujan_mm_clean", pa.float32()),
+    ("Kelembapan_Persen_clean", pa.float32()),
+])
+KEY_COLS = ["Kabupaten_Kota", "Tanggal"]
+
+# Presisi desimal kolom float32, supaya nilai asli bisa dipulihkan tanpa selisih
+DECIMALS = {"Suhu_Rata_C_clean": 2, "Curah_Hujan_mm_clean": 2, "Kelembapan_Persen_clean": 2}
+
+
+def validate(table):
+    missing = [name for name in SCHEMA.names if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di dataset: {missing}")
+
+    for name in KEY_COLS + ["Tahun", "Bulan"]:
+        if table[name].null_count:
+            raise ValueError(f"Kolom '{name}' berisi {table[name].null_count} nilai kosong")
+
+    year = pc.year(table["Tanggal"]).cast(pa.int16())
+    if not pc.all(pc.equal(year, table["Tahun"])).as_py():
+        raise ValueError("Kolom 'Tahun' tidak sesuai dengan 'Tanggal'")
+
+    for name, decimals in DECIMALS.items():
+        values = table[name].to_numpy()
+        if not np.array_equal(np.round(values, decimals), values, equal_nan=True):
+            raise ValueError(f"Kolom '{name}' punya lebih dari {decimals} desimal")
+
+    keys = table.select(KEY_COLS).group_by(KEY_COLS).aggregate([([], "count_all")])
+    if keys.num_rows != table.num_rows:
+        raise ValueError("Ada baris duplikat untuk kombinasi Kabupaten_Kota + Tanggal")
+
+
+def read_csv(csv_path):
+    # Parser CSV pyarrow berjalan multi-thread; hasil divalidasi lalu dicast ke SCHEMA
+    with Trace.span("load_csv"):
+        table = pv.read_csv(csv_path, convert_options=pv.ConvertOptions(
+            column_types={field.name: field.type for field in SCHEMA if not pa.types.is_dictionary(field.type)},
+        ))
+    with Trace.span("validate"):
+        validate(table)
+
+    columns = [table[field.name].cast(field.type) for field in SCHEMA]
+    return pa.Table.from_arrays(columns, schema=SCHEMA)
+
+
+def _write(table, out_path):
+    tmp_path = f"{out_path}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, out_path)
+
+
+def _csv_rows(table, header):
+    # Baris CSV (tanpa header) dari tabel tervalidasi, kolom mengikuti urutan header Limao.csv
+    unknown = [name for name in header if name not in SCHEMA.names]
+    if unknown:
+        raise ValueError(f"Header {CSV_PATH} berisi kolom di luar skema: {unknown}")
+    columns = []
+    for name in header:
+        column = table[name]
+        if pa.types.is_timestamp(column.type):
+            column = column.cast(pa.date32())
+        elif pa.types.is_dictionary(column.type):
+            column = column.cast(pa.string())
+        elif pa.types.is_float32(column.type):
+            # Lewat teks terpendek float32, jadi 9.01 tetap 9.01 (bukan 9.010000228881836)
+            column = column.cast(pa.string()).cast(pa.float64())
+        columns.append(column)
+    sink = pa.BufferOutputStream()
+    pv.write_csv(pa.Table.from_arrays(columns, names=header), sink, pv.WriteOptions(include_header=False))
+    return sink.getvalue().to_pybytes()
+
+
+def ingest(csv_path=CSV_PATH, out_path=DATASET_PATH):
+    """Validate the CSV once and store it as an uncompressed Arrow IPC file.
+
+    Uncompressed IPC can be memory-mapped, so later loads do not parse text
+    and numeric columns are shared from the page cache.
+    """
+    table = read_csv(csv_path)
+    _write(table, out_path)
+    return table
+
+
+def append(new_csv_path, csv_path=CSV_PATH, out_path=DATASET_PATH):
+    """Append the rows of ``new_csv_path`` to the stored dataset.
+
+    Only the new rows are parsed and validated; existing rows are taken from
+    the memory-mapped Arrow file and only checked against each district's
+    last month. Lag features follow row order (``groupby.shift``,
+    ``LagState``), so every new row must come after the last stored month of
+    its district; backfills raise ``ValueError``, and the batch itself is
+    stored sorted by district and date. The validated rows are also written
+    to the CSV, in its own column order, so it stays the source of truth.
+    Returns the new rows as an Arrow table.
+    """
+    new = read_csv(new_csv_path)
+    existing = load_table(out_path)
+
+    new_keys = new.select(KEY_COLS).to_pandas().astype({"Kabupaten_Kota": str})
+    last = existing.group_by("Kabupaten_Kota").aggregate([("Tanggal", "max")]).to_pandas()
+    last = last.set_index(last["Kabupaten_Kota"].astype(str))["Tanggal_max"]
+    first_new = new_keys.groupby("Kabupaten_Kota")["Tanggal"].min()
+    stale = first_new[first_new <= last.reindex(first_new.index)]
+    if len(stale):
+        name = stale.index[0]
+        raise ValueError(f"{len(stale)} kabupaten punya baris baru yang tidak setelah bulan terakhirnya, "
+                         f"mis. {name}: {stale.iloc[0]:%Y-%m} <= {last[name]:%Y-%m}")
+
+    # Urut per kabupaten & tanggal, apa pun urutan baris di file batch
+    new = new.take(new_keys.sort_values(KEY_COLS, kind="stable").index.to_numpy())
+
+    # CSV dulu, baru Arrow: file Arrow tetap lebih baru sehingga ensure_dataset tidak ingest ulang
+    with open(csv_path, "rb") as src:
+        rows = _csv_rows(new, src.readline().decode().strip().split(","))
+    with open(csv_path, "rb+") as dst:
+        dst.seek(0, os.SEEK_END)
+        if dst.tell():
+            dst.seek(-1, os.SEEK_END)
+            if dst.read(1) != b"\n":
+                dst.write(b"\n")
+        dst.write(rows)
+
+    combined = pa.concat_tables([existing, new]).unify_dictionaries()
+    _write(combined, out_path)
+    return new
+
+
+def ensure_dataset(csv_path=None, path=DATASET_PATH):
+    # Ingest ulang hanya jika file Arrow belum ada atau CSV lebih baru. Tanpa csv_path hanya
+    # DATASET_PATH yang bersumber dari Limao.csv; file Arrow lain (mis. Bench) dipakai apa adanya.
+    if csv_path is None:
+        if path != DATASET_PATH:
+            return path
+        csv_path = CSV_PATH
+    if not os.path.exists(path) or (
+        os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path)
+    ):
+        ingest(csv_path, path)
+    return path
+
+
+def load_table(path=DATASET_PATH, columns=None):
+    ensure_dataset(path=path)
+    with Trace.span("load_dataset"):
+        return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def load_dataset(path=DATASET_PATH, columns=None):
+    # split_blocks: kolom numerik tanpa null bisa langsung menunjuk ke memory map
+    return load_table(path, columns).to_pandas(split_blocks=True)
+
+
+def restore_precision(df):
+    # float32 -> float64 dengan nilai desimal persis seperti di CSV (untuk modelling)
+    for name, decimals in DECIMALS.items():
+        if name in df.columns:
+            df[name] = np.round(df[name].to_numpy(dtype="float64"), decimals)
+    return df
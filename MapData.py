@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+GEOJSON_PATH = "Main.geojson"
+NAME_PROPERTY = "name"
+
+
+def district_names(names):
+    # Samakan format nama (pastikan ada prefix "Kabupaten"/"Kota")
+    names = pd.Series(names, dtype=str)
+    return names.where(names.str.startswith(("Kabupaten", "Kota")), "Kabupaten " + names)
+
+
+def load_geometry(path=GEOJSON_PATH):
+    """Read the boundary GeoJSON once and key each feature by district name.
+
+    Only ``id`` and geometry are kept, so the payload handed to Plotly carries
+    no attribute columns. Returns ``(geojson, ids)``.
+    """
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+
+    features = []
+    for feature in source["features"]:
+        name = feature.get("properties", {}).get(NAME_PROPERTY)
+        if name is None:
+            continue
+        features.append({"type": "Feature", "id": name, "properties": {}, "geometry": feature["geometry"]})
+
+    geojson = {"type": "FeatureCollection", "features": features}
+    return geojson, np.array([feature["id"] for feature in features])
+
+
+def production_by_district(df, value_col="Produksi_Padi_Ton_clean"):
+    # Agregasi data produksi per kabupaten/kota, index = id fitur GeoJSON
+    totals = df.groupby("Kabupaten_Kota")[value_col].sum()
+    totals.index = district_names(totals.index)
+    return totals
+
+
+def values_for(ids, totals):
+    # Nilai sejajar dengan urutan fitur; kabupaten tanpa data -> NaN
+    return totals.reindex(ids).to_numpy()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Di atas jumlah baris ini scatter/boxplot dirender dari ringkasan server-side
+# (grid 2D / statistik kuartil), bukan dari setiap baris
+MAX_POINTS = 10_000
+GRID_BINS = 80
+MAX_OUTLIERS = 500
+
+RENDER_MODES = {"Otomatis": "auto", "Semua titik": "points", "Ringkas": "binned"}
+
+
+def use_binned(n_rows, mode="auto", max_points=MAX_POINTS):
+    # "auto": ringkas hanya jika data melebihi max_points
+    if mode == "auto":
+        return n_rows > max_points
+    return mode == "binned"
+
+
+def bin_2d(x, y, bins=GRID_BINS):
+    """Count points on a ``bins`` x ``bins`` grid over the x/y range.
+
+    Returns ``(x_centers, y_centers, counts)`` with ``counts`` shaped
+    ``(len(y_centers), len(x_centers))`` (the layout of a heatmap ``z``)
+    and empty cells set to NaN, so the payload size depends on ``bins``
+    only, not on the number of rows.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=bins)
+    counts = counts.T
+    counts[counts == 0] = np.nan
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts
+
+
+def box_stats(values, max_outliers=MAX_OUTLIERS, seed=42):
+    """Tukey box summary of ``values`` plus a capped random sample of outliers.
+
+    Quartiles use linear interpolation and the whiskers end at the most
+    extreme values within 1.5 IQR, like Plotly's own box trace. Returns a
+    dict with ``q1``, ``median``, ``q3``, ``lowerfence``, ``upperfence``,
+    ``mean``, ``outliers`` (at most ``max_outliers`` values) and
+    ``n_outliers``.
+    """
+    values = pd.Series(values).dropna().to_numpy(dtype=float)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    outliers = values[~inside]
+    if len(outliers) > max_outliers:
+        outliers = np.random.default_rng(seed).choice(outliers, max_outliers, replace=False)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": values[inside].min(),
+        "upperfence": values[inside].max(),
+        "mean": values.mean(),
+        "outliers": np.sort(outliers),
+        "n_outliers": int((~inside).sum()),
+    }
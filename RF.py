@@ -1,30 +1,41 @@
 from sklearn.ensemble import RandomForestRegressor
-from Data import X_scaled, X_train_scaled, X_test_scaled, y_train, y_test, smape
+from sklearn.metrics import mean_squared_error
+import numpy as np
 import joblib
 
-# Instantiate the Random Forest Regressor model
-rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+import Trace
 
-# Train the model on the scaled training data
-rf_model.fit(X_train_scaled, y_train)
+MODEL_PATH = "RFM.pkl"
 
-print("Random Forest model trained successfully on scaled data.")
 
-from sklearn.metrics import mean_squared_error
-import numpy as np
+def train_rf(X_train, y_train, **params):
+    # Instantiate the Random Forest Regressor model
+    rf_model = RandomForestRegressor(**{"n_estimators": 100, "random_state": 42, **params})
+
+    # Train the model on the scaled training data
+    with Trace.span("fit.rf", rows=len(X_train)):
+        rf_model.fit(X_train, y_train)
+    return rf_model
+
+
+if __name__ == "__main__":
+    from Data import X_train_scaled, X_test_scaled, y_train, y_test, smape
+
+    rf_model = train_rf(X_train_scaled, y_train)
+    print("Random Forest model trained successfully on scaled data.")
 
-# Make predictions on the scaled test data
-y_pred_rf = rf_model.predict(X_test_scaled)
+    # Make predictions on the scaled test data
+    y_pred_rf = rf_model.predict(X_test_scaled)
 
-# Calculate RMSE
-rmse_rf = np.sqrt(mean_squared_error(y_test, y_pred_rf))
+    # Calculate RMSE
+    rmse_rf = np.sqrt(mean_squared_error(y_test, y_pred_rf))
 
-# Calculate SMAPE
-smape_rf = smape(y_test, y_pred_rf)
+    # Calculate SMAPE
+    smape_rf = smape(y_test, y_pred_rf)
 
-# Print the evaluation metrics
-print(f"Random Forest Model Evaluation (with increased lags and seasonal features):")
-print(f"RMSE: {rmse_rf:.2f}")
-print(f"SMAPE: {smape_rf:.2f}%")
+    # Print the evaluation metrics
+    print(f"Random Forest Model Evaluation (with increased lags and seasonal features):")
+    print(f"RMSE: {rmse_rf:.2f}")
+    print(f"SMAPE: {smape_rf:.2f}%")
 
-joblib.dump(rf_model, "RFM.pkl")
\ No newline at end of file
+    joblib.dump(rf_model, MODEL_PATH)
@@ -0,0 +1,224 @@
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from Cube import data_version
+from Ingest import DATASET_PATH
+
+CACHE_DIR = os.path.join(".cache", "forecasts")
+CACHE_MAX_ENTRIES = 64      # LRU: file paling lama tidak dipakai dihapus di atas batas ini
+MAX_WORKERS = 2
+
+_lock = threading.Lock()
+_pool = None
+_jobs = {}          # cache key -> Job yang sedang antre/jalan (request sama tidak dihitung dua kali)
+_data_hashes = {}   # (path, versi file) -> dataset_key
+
+
+# ================================
+# Kunci cache: (data, artifact, horizon, bulan mulai, kabupaten)
+# ================================
+def data_hash(path=DATASET_PATH):
+    # Hash isi dataset + config pipeline; dihitung ulang hanya jika file berubah
+    version = (path, data_version(path))
+    if version not in _data_hashes:
+        from Data import dataset_key
+        _data_hashes[version] = dataset_key(path)
+    return _data_hashes[version]
+
+
+def artifact_hash(version=None):
+    import Artifacts
+
+    store = Artifacts.open_store(version)
+    with open(os.path.join(store.path, Artifacts.MANIFEST), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16], store.version
+
+
+def cache_key(data_hash, artifact_hash, periods, start, districts=None):
+    payload = {
+        "data": data_hash,
+        "artifacts": artifact_hash,
+        "periods": int(periods),
+        "start": pd.Timestamp(start).strftime("%Y-%m"),
+        "districts": sorted(districts) if districts is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+# ================================
+# Cache hasil di disk (Arrow, LRU berdasarkan mtime)
+# ================================
+def _cache_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.arrow")
+
+
+def load_cached(key, cache_dir=CACHE_DIR):
+    path = _cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    os.utime(path)      # tandai baru dipakai (urutan LRU)
+    return feather.read_table(path).to_pandas()
+
+
+def _save(key, frame, cache_dir=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(key, cache_dir)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    feather.write_feather(frame, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    evict(max_entries, cache_dir)
+
+
+def evict(max_entries=CACHE_MAX_ENTRIES, cache_dir=CACHE_DIR):
+    # Hapus hasil yang paling lama tidak dipakai sampai tersisa max_entries
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".arrow")]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[max_entries:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ================================
+# Job di worker pool
+# ================================
+class Job:
+    """One forecast request. ``status`` goes queued -> running -> done/failed.
+
+    ``progress`` is the fraction of horizon steps finished. ``result`` holds
+    the district forecasts (layout of ``1YPrediction_K.csv``) once done;
+    ``province`` derives the province totals from it.
+    """
+
+    def __init__(self, key, periods, start, districts, artifact_version):
+        self.key = key
+        self.periods = periods
+        self.start = start
+        self.districts = districts
+        self.artifact_version = artifact_version
+        self.status = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.cached = False
+        self.seconds = None
+        self.future = None
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def province(self):
+        from Forecast import aggregate_province
+        return None if self.result is None else aggregate_province(self.result)
+
+    def wait(self, timeout=None):
+        if self.future is not None:
+            self.future.result(timeout)
+        if self.status == "failed":
+            raise RuntimeError(self.error)
+        return self.result
+
+
+def _history(start, districts):
+    from Data import prepare_dataset
+
+    df = prepare_dataset()["df"]
+    df = df[df["Tanggal"] < start]
+    if districts is not None:
+        df = df[df["Kabupaten_Kota"].isin(districts)]
+    return df
+
+
+def _run(job):
+    import Artifacts
+    from Forecast import BAND_QUANTILES, forecast_districts
+
+    job.status = "running"
+    began = time.perf_counter()
+    try:
+        store = Artifacts.open_store(job.artifact_version)
+        frame = forecast_districts(_history(job.start, job.districts), store.features, None, store.rf, store.lgbm,
+                                   periods=job.periods, clip_negative=True, quantiles=BAND_QUANTILES,
+                                   lgbm_quantile_models=store.lgbm_quantiles,
+                                   progress=lambda step, total: setattr(job, "progress", step / total))
+        frame["Kabupaten_Kota"] = frame["Kabupaten_Kota"].astype(str)
+        _save(job.key, frame)
+        job.result, job.status = frame, "done"
+    except Exception as e:
+        job.error, job.status = repr(e), "failed"
+    finally:
+        job.seconds = time.perf_counter() - began
+        with _lock:
+            _jobs.pop(job.key, None)
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="forecast")
+    return _pool
+
+
+def last_month(path=DATASET_PATH):
+    from Ingest import load_table
+    return pd.Timestamp(load_table(path, columns=["Tanggal"]).column("Tanggal").to_pandas().max())
+
+
+def request(periods=12, start=None, districts=None, artifact_version=None):
+    """Return a ``Job`` for this forecast; never blocks on the computation.
+
+    ``start`` is the first forecast month (default: the month after the last
+    observed one); earlier months forecast from the history before ``start``.
+    ``districts`` limits the forecast to those districts (default: all).
+    Results are cached on disk under a key of (dataset hash, artifact
+    manifest hash, periods, start, districts), so a repeated request returns
+    a finished job straight from the cache. New combinations run in a
+    background thread pool; poll ``job.progress``/``job.status``.
+    """
+    start = pd.Timestamp(start) if start is not None else last_month() + pd.offsets.MonthBegin()
+    districts = sorted(districts) if districts is not None else None
+    manifest_hash, artifact_version = artifact_hash(artifact_version)
+    key = cache_key(data_hash(), manifest_hash, periods, start, districts)
+
+    with _lock:
+        if key in _jobs:
+            return _jobs[key]
+
+        job = Job(key, periods, start, districts, artifact_version)
+        cached = load_cached(key)
+        if cached is not None:
+            job.result, job.status, job.progress, job.cached = cached, "done", 1.0, True
+        else:
+            _jobs[key] = job
+            job.future = _executor().submit(_run, job)
+        return job
+
+
+def forecast(periods=12, start=None, districts=None, artifact_version=None):
+    # Versi blocking dari request(): tunggu hasil dan kembalikan DataFrame kabupaten
+    return request(periods, start, districts, artifact_version).wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast on-demand dengan cache hasil")
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--start", help="Bulan pertama forecast, mis. 2024-01 (default: setelah data terakhir)")
+    parser.add_argument("--district", action="append", help="Bisa diulang (default semua kabupaten)")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    job = request(args.periods, args.start, args.district)
+    job.wait()
+    print(f"{job.key}: {len(job.result)} rows, {'cache hit' if job.cached else 'computed'} "
+          f"in {time.perf_counter() - began:.2f} s")
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+# ================================
+# Konfigurasi
+# ================================
+GDB_PATH = "Kotaw.gdb"
+LAYER = "ADMINISTRASI_AR_KABKOTA"
+NAME_FIELD = "WADMKK"   # nama kabupaten/kota di skema RBI
+CACHE_DIR = os.path.join(".cache", "spatial")
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_name(name):
+    # "Kabupaten Malang" -> "malang", "Kota Malang" -> "kota malang" (samakan dengan nama di GDB)
+    name = str(name).strip().lower()
+    for prefix in ("kabupaten ", "kab. ", "kab "):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def row_standardize(W):
+    W = sparse.csr_matrix(W, dtype=float)
+    row_sum = np.asarray(W.sum(axis=1)).ravel()
+    inv = np.divide(1.0, row_sum, out=np.zeros_like(row_sum), where=row_sum > 0)
+    return sparse.diags(inv) @ W
+
+
+def _source_stamp(path):
+    # .gdb adalah folder: pakai mtime semua file di dalamnya
+    if os.path.isdir(path):
+        return [(f, os.path.getmtime(os.path.join(path, f))) for f in sorted(os.listdir(path))]
+    return os.path.getmtime(path)
+
+
+def _cached(kind, key_parts, build):
+    # W disimpan sebagai CSR .npz, key = hash dari input + parameter
+    key = hashlib.sha256(json.dumps(key_parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    path = os.path.join(CACHE_DIR, f"{kind}_{key}.npz")
+    if os.path.exists(path):
+        return sparse.load_npz(path).tocsr()
+    W = build().tocsr()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    sparse.save_npz(path, W)
+    return W
+
+
+# ================================
+# Matriks bobot spasial (CSR, row-standardized)
+# ================================
+def distance_weights(names, lat, lon, k=8, power=1.0, use_cache=True):
+    """Inverse-distance weights to each district's ``k`` nearest neighbours.
+
+    Uses a KD-tree on unit-sphere coordinates, so building W is
+    O(n log n) and W has ``n * k`` non-zeros instead of ``n ** 2``.
+    """
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    n = len(lat)
+    k = min(k, n - 1)
+
+    def build():
+        xyz = np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+        chord, idx = cKDTree(xyz).query(xyz, k=k + 1)
+        chord, idx = chord[:, 1:], idx[:, 1:]   # buang diri sendiri
+        dist_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+        weights = 1.0 / np.maximum(dist_km, 1e-6) ** power
+        rows = np.repeat(np.arange(n), k)
+        W = sparse.csr_matrix((weights.ravel(), (rows, idx.ravel())), shape=(n, n))
+        return row_standardize(W)
+
+    if not use_cache:
+        return build()
+    key = {"names": list(map(str, names)), "lat": lat.round(8).tolist(),
+           "lon": lon.round(8).tolist(), "k": k, "power": power}
+    return _cached("distance", key, build)
+
+
+def queen_weights(names, gdb_path=GDB_PATH, layer=LAYER, name_field=NAME_FIELD, use_cache=True):
+    """Queen contiguity (shared edge or vertex) between district polygons.
+
+    Neighbours come from one bulk spatial-index query over all polygons, so
+    there is no per-district Python loop.
+    """
+    names = list(map(str, names))
+
+    def build():
+        import geopandas as gpd
+
+        gdf = gpd.read_file(gdb_path, layer=layer, columns=[name_field])
+        gdf["key"] = gdf[name_field].map(normalize_name)
+        gdf = gdf.dissolve(by="key").reindex([normalize_name(n) for n in names])
+
+        missing = [n for n, geom in zip(names, gdf.geometry) if geom is None]
+        if missing:
+            raise ValueError(f"Polygon tidak ditemukan untuk: {missing}")
+
+        left, right = gdf.sindex.query(gdf.geometry.values, predicate="intersects")
+        keep = left != right
+        W = sparse.csr_matrix((np.ones(keep.sum()), (left[keep], right[keep])),
+                              shape=(len(names), len(names)))
+        return row_standardize(W)
+
+    if not use_cache:
+        return build()
+    key = {"names": names, "layer": layer, "field": name_field, "source": _source_stamp(gdb_path)}
+    return _cached("queen", key, build)
+
+
+def weights_for(raw, kind="distance", **kwargs):
+    # W untuk urutan kabupaten di `raw` (urutan kemunculan, sama dengan Forecast)
+    districts = raw.drop_duplicates("Kabupaten_Kota")
+    names = districts["Kabupaten_Kota"].to_numpy()
+    if kind == "distance":
+        return names, distance_weights(names, districts["Latitude_dd"], districts["Longitude_dd"], **kwargs)
+    if kind == "queen":
+        return names, queen_weights(names, **kwargs)
+    raise ValueError(f"Jenis bobot spasial tidak dikenal: {kind}")
+
+
+# ================================
+# Spatial lag features
+# ================================
+def spatial_lag_features(df, W, names, cols, lags=(1,)):
+    """Neighbour-weighted lags ``{col}_splag_{lag}`` = (W @ col)[t - lag].
+
+    All months and columns are stacked into one (district x month*col)
+    block, so the whole table costs a single sparse matrix product.
+    """
+    months = np.sort(df["Tanggal"].unique())
+    d_idx = pd.Index(names).get_indexer(df["Kabupaten_Kota"])
+    t_idx = pd.Index(months).get_indexer(df["Tanggal"])
+
+    block = np.full((len(names), len(months), len(cols)), np.nan)
+    block[d_idx, t_idx] = df[cols].to_numpy(dtype=float)
+
+    spatial = (W @ block.reshape(len(names), -1)).reshape(block.shape)
+
+    out = {}
+    for c, col in enumerate(cols):
+        for lag in lags:
+            shifted = np.full((len(names), len(months)), np.nan)
+            shifted[:, lag:] = spatial[:, :len(months) - lag, c]
+            out[f"{col}_splag_{lag}"] = shifted[d_idx, t_idx]
+    return pd.DataFrame(out, index=df.index)
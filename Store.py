@@ -0,0 +1,73 @@
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+import Ingest
+from Cube import data_version
+
+# Sama dengan Forecast.PROVINCE_PATH / DISTRICT_PATH; tidak di-import supaya dashboard
+# tidak ikut memuat sklearn lewat Forecast -> Data
+PROVINCE_PATH = "1YPrediction.csv"
+DISTRICT_PATH = "1YPrediction_K.csv"
+
+
+def _read_prediction(path):
+    return pa.Table.from_pandas(pd.read_csv(path, parse_dates=["Tanggal"]), preserve_index=False)
+
+
+# Dataset yang dibagi ke semua sesi: nama -> (path, reader yang mengembalikan pa.Table)
+DATASETS = {
+    "limao": (Ingest.DATASET_PATH, Ingest.load_table),
+    "prediction": (PROVINCE_PATH, _read_prediction),
+    "prediction_k": (DISTRICT_PATH, _read_prediction),
+}
+
+_lock = threading.Lock()
+_entries = {}   # nama -> {"version", "table", "frame"}
+
+
+def _entry(name):
+    path, reader = DATASETS[name]
+    version = data_version(path)
+    entry = _entries.get(name)
+    if entry is not None and entry["version"] == version:
+        return entry
+
+    # Satu thread yang memuat ulang; sesi lain menunggu lalu memakai hasil yang sama
+    with _lock:
+        entry = _entries.get(name)
+        if entry is None or entry["version"] != version:
+            entry = {"version": version, "table": reader(path), "frame": None}
+            _entries[name] = entry
+        return entry
+
+
+def version(name):
+    # Versi file (ukuran + mtime) yang sedang dimuat, untuk kunci cache turunan
+    return _entry(name)["version"]
+
+
+def table(name):
+    """Shared, immutable Arrow table for ``name``; reloaded only when the file changes."""
+    return _entry(name)["table"]
+
+
+def frame(name):
+    """Shared pandas view of ``table(name)``, converted once per file version.
+
+    Numeric columns without nulls are zero-copy views of the Arrow buffers
+    and therefore read-only; callers must not modify the frame in place
+    (``sort_values``, filtering, ``assign`` etc. return new frames anyway).
+    """
+    entry = _entry(name)
+    if entry["frame"] is None:
+        with _lock:
+            if entry["frame"] is None:
+                entry["frame"] = entry["table"].to_pandas(split_blocks=True)
+    return entry["frame"]
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,234 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+# Aktif hanya jika LIMAO_TRACE diset (mis. LIMAO_TRACE=1). Saat nonaktif, span() hanya
+# mengembalikan objek no-op yang sama, jadi biayanya satu function call.
+ENABLED = os.environ.get("LIMAO_TRACE", "") not in ("", "0")
+LOG_PATH = os.environ.get("LIMAO_TRACE_LOG", os.path.join(".cache", "trace", "spans.jsonl"))
+PROM_PATH = os.environ.get("LIMAO_TRACE_PROM")     # opsional: Prometheus textfile collector
+
+# Id run dibuat oleh proses utama dan diwariskan ke worker (ProcessPoolExecutor) lewat
+# environment, jadi total Prometheus mencakup span dari semua proses dalam satu run.
+_OWNS_RUN = ENABLED and "LIMAO_TRACE_RUN" not in os.environ
+if _OWNS_RUN:
+    os.environ["LIMAO_TRACE_RUN"] = f"{os.getpid()}-{time.time_ns()}"
+RUN_ID = os.environ.get("LIMAO_TRACE_RUN")
+
+_local = threading.local()
+_lock = threading.Lock()
+_log_file = None
+
+
+def _rss_mb():
+    # RSS saat ini (Linux /proc); None di platform lain
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    # Puncak RSS proses (ru_maxrss: KB di Linux, byte di macOS); None tanpa modul resource
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def stop(self):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Wall time, CPU time and memory of one named block.
+
+    Use as a context manager, or call ``start()``/``stop()`` for blocks that
+    cannot be indented (e.g. a Streamlit page branch). Nested spans record
+    their parent's path, e.g. ``forecast/forecast.step``.
+    """
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def start(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.path = "/".join([s.name for s in stack] + [self.name])
+        stack.append(self)
+        self._peak_before = _peak_rss_mb()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def stop(self, error=None):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = _peak_rss_mb()
+        stack = _local.stack
+        if self in stack:
+            stack.remove(self)
+
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "name": self.name,
+            "path": self.path,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rss_mb": _rss_mb(),
+            "peak_rss_mb": peak,
+            # Kenaikan puncak memori proses selama span (0 jika puncak lama tidak terlampaui)
+            "peak_growth_mb": None if peak is None else peak - self._peak_before,
+            "pid": os.getpid(),
+            "run": RUN_ID,
+            **({"error": error} if error else {}),
+            **({"attrs": self.attrs} if self.attrs else {}),
+        }
+        _record(record)
+        return record
+
+    __enter__ = start
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop(exc_type.__name__ if exc_type else None)
+        return False
+
+
+def span(name, **attrs):
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def start(name, **attrs):
+    return span(name, **attrs).start() if ENABLED else _NULL_SPAN
+
+
+def traced(name=None):
+    # Decorator: seluruh pemanggilan fungsi menjadi satu span
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ================================
+# Output: JSON lines + Prometheus textfile
+# ================================
+def _record(record):
+    global _log_file
+    with _lock:
+        if _log_file is None:
+            os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+            _log_file = open(LOG_PATH, "a", encoding="utf-8", buffering=1)
+        _log_file.write(json.dumps(record) + "\n")
+
+
+def _run_stats(log_path=LOG_PATH, run=RUN_ID):
+    # name -> [count, wall_s, cpu_s, max_wall_s, peak_rss_mb] untuk satu run, dari log JSONL
+    stats = {}
+    if not os.path.exists(log_path):
+        return stats
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("run") != run:
+                continue
+            st = stats.setdefault(record["name"], [0, 0.0, 0.0, 0.0, 0.0])
+            st[0] += 1
+            st[1] += record["wall_s"]
+            st[2] += record["cpu_s"]
+            st[3] = max(st[3], record["wall_s"])
+            st[4] = max(st[4], record["peak_rss_mb"] or 0.0)
+    return stats
+
+
+def write_prometheus(path=PROM_PATH, log_path=LOG_PATH, run=RUN_ID):
+    """Write per-span totals in Prometheus text format (for node_exporter's textfile collector).
+
+    Totals come from the JSON lines log, so spans recorded by worker
+    processes of the same run are included.
+    """
+    families = [
+        ("limao_span_count", "counter", lambda st: f"{st[0]}"),
+        ("limao_span_wall_seconds_total", "counter", lambda st: f"{st[1]:.6f}"),
+        ("limao_span_cpu_seconds_total", "counter", lambda st: f"{st[2]:.6f}"),
+        ("limao_span_wall_seconds_max", "gauge", lambda st: f"{st[3]:.6f}"),
+        ("limao_span_peak_rss_bytes", "gauge", lambda st: f"{int(st[4] * 2 ** 20)}"),
+    ]
+    stats = sorted(_run_stats(log_path, run).items())
+
+    # Satu grup baris per metric (format text Prometheus)
+    lines = []
+    for metric, kind, value in families:
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, st in stats:
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{span="{label}"}} {value(st)}')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+# Hanya proses pemilik run yang menulis file (worker spawn mengimpor modul ini lagi)
+if _OWNS_RUN and PROM_PATH:
+    atexit.register(write_prometheus)
+
+
+# ================================
+# Baca log
+# ================================
+def load_spans(path=LOG_PATH):
+    import pandas as pd
+
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["ts", "name", "path", "wall_s", "cpu_s", "rss_mb", "peak_rss_mb",
+                                     "peak_growth_mb", "pid"])
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def slowest(spans, n=20):
+    # Ringkasan per nama span, diurutkan dari total wall time terbesar
+    summary = spans.groupby("name").agg(
+        count=("wall_s", "size"),
+        total_s=("wall_s", "sum"),
+        mean_s=("wall_s", "mean"),
+        p95_s=("wall_s", lambda s: s.quantile(0.95)),
+        max_s=("wall_s", "max"),
+        cpu_s=("cpu_s", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"),
+    )
+    return summary.sort_values("total_s", ascending=False).head(n)
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import pandas as pd
+import joblib
+import time
+
+from Data import dataset_key, prepare_dataset, save_artifacts, smape
+from Forecast import BAND_QUANTILES
+import Artifacts
+import Trace
+import RF
+import LGBM
+
+PREDICTIONS_PATH = "test_predictions.pkl"
+
+# name -> (fungsi training, path model)
+MODELS = {
+    "RF": (RF.train_rf, RF.MODEL_PATH),
+    "LGBM": (LGBM.train_lgbm, LGBM.MODEL_PATH),
+}
+POINT_MODELS = tuple(MODELS)
+
+# Model kuantil LightGBM untuk band prediksi, mis. "LGBM_Q10"
+QUANTILE_MODELS = {f"LGBM_Q{round(q * 100):02d}": q for q in BAND_QUANTILES}
+for _name, _q in QUANTILE_MODELS.items():
+    MODELS[_name] = (partial(LGBM.train_lgbm_quantile, alpha=_q), LGBM.quantile_model_path(_q))
+
+
+def _fit_and_save(name):
+    # Dijalankan di worker process: dataset diambil dari feature cache
+    train_fn, model_path = MODELS[name]
+    data = prepare_dataset()
+
+    # Parameter terbaik dari Tune.py (jika sudah pernah di-tuning untuk dataset ini); di-import
+    # di sini supaya kode tuning/SQLite tidak ikut dimuat oleh setiap yang meng-import Train
+    params = {}
+    if name in POINT_MODELS:
+        import Tune
+        params = Tune.best_params(name, dataset_key(**data["config"]))
+
+    start = time.perf_counter()
+    model = train_fn(data["X_train_scaled"], data["y_train"], **params)
+    fit_seconds = time.perf_counter() - start
+
+    joblib.dump(model, model_path)
+    with Trace.span("predict.test", model=name):
+        y_pred = model.predict(data["X_test_scaled"])
+    return name, y_pred, fit_seconds
+
+
+def train_all(models=tuple(MODELS)):
+    """Fit every model once, each in its own worker process.
+
+    Saves the models plus scaler/features artifacts, and writes the test-set
+    predictions to ``test_predictions.pkl`` so Blended.py can evaluate blends
+    without refitting anything. When both models are trained, a new version
+    is also published to the artifact store (see Artifacts.py).
+    """
+    # Siapkan (dan cache) dataset sebelum worker dibuat
+    data = prepare_dataset()
+    save_artifacts(data)
+
+    with ProcessPoolExecutor(max_workers=len(models)) as pool:
+        results = list(pool.map(_fit_and_save, models))
+
+    predictions = pd.DataFrame({
+        "Tanggal": data["df"].loc[data["y_test"].index, "Tanggal"],
+        "Kabupaten_Kota": data["df"].loc[data["y_test"].index, "Kabupaten_Kota"],
+        "y_test": data["y_test"],
+    })
+    for name, y_pred, fit_seconds in results:
+        predictions[f"{name}_Pred"] = y_pred
+        print(f"{name} model trained in {fit_seconds:.1f}s -> {MODELS[name][1]}")
+
+    predictions.to_pickle(PREDICTIONS_PATH)
+    print(f"Saved test-set predictions to {PREDICTIONS_PATH}")
+
+    if set(POINT_MODELS) <= set(models):
+        metrics = {}
+        for name in POINT_MODELS:
+            y_pred = predictions[f"{name}_Pred"]
+            metrics[name] = {"rmse": float(np.sqrt(np.mean((predictions["y_test"] - y_pred) ** 2))),
+                             "smape": float(smape(predictions["y_test"], y_pred))}
+        for name, q in QUANTILE_MODELS.items():
+            if name in models:
+                covered = (predictions["y_test"] <= predictions[f"{name}_Pred"]).mean()
+                metrics[name] = {"quantile": q, "coverage": float(covered)}
+
+        lgbm_quantiles = {q: joblib.load(MODELS[name][1]) for name, q in QUANTILE_MODELS.items() if name in models}
+        version = Artifacts.publish(data["features"], data["scaler"],
+                                    joblib.load(RF.MODEL_PATH), joblib.load(LGBM.MODEL_PATH),
+                                    data_hash=dataset_key(**data["config"]), metrics=metrics,
+                                    lgbm_quantiles=lgbm_quantiles)
+        print(f"Published artifacts version {version}")
+    return predictions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Training RF + LightGBM (paralel) lalu walk-forward backtest")
+    parser.add_argument("--no-backtest", action="store_true", help="Lewati Backtest.py setelah training")
+    args = parser.parse_args()
+
+    train_all()
+    if not args.no_backtest:
+        # Hasil backtest (dibaca halaman Prediksi) dibuat ulang setiap training, tidak di-commit
+        import Backtest
+        results = Backtest.run_backtest()
+        print(f"Saved backtest of {results['fold'].nunique()} folds to {Backtest.RESULTS_PATH}")
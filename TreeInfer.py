@@ -0,0 +1,276 @@
+import time
+
+import numpy as np
+
+# ================================
+# Ensemble pohon dalam bentuk array datar
+# ================================
+ARRAY_FIELDS = ("feature", "threshold", "children", "value", "nan_left", "roots")
+
+
+class CompiledEnsemble:
+    """Tree ensemble flattened into NumPy node arrays.
+
+    All trees share one node table (``feature``, ``threshold``, ``children``,
+    ``value``, ``nan_left``); ``roots`` holds each tree's first node and
+    ``children[2 * node + go_left]`` is the next node. Leaves point to
+    themselves, so ``predict_trees`` can advance every (tree, sample) pair
+    one level per iteration with plain gathers and stop after ``depth``
+    levels. When compiled with a ``MinMaxScaler`` the thresholds are already
+    in raw feature units, so inputs are not scaled.
+    """
+
+    def __init__(self, feature, threshold, children, value, nan_left, roots,
+                 depth, aggregate, n_features, float32_inputs=False):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children        # [kanan, kiri] per node, diratakan
+        self.value = value
+        self.nan_left = nan_left
+        self.roots = roots
+        self.depth = int(depth)
+        self.aggregate = aggregate      # "mean" (RF) atau "sum" (LightGBM)
+        self.n_features = int(n_features)
+        self.float32_inputs = bool(float32_inputs)   # sklearn membandingkan fitur dalam float32
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def left(self):
+        return self.children[1::2]
+
+    @property
+    def right(self):
+        return self.children[0::2]
+
+    def apply(self, X):
+        # Index leaf untuk tiap (pohon, sampel): shape (n_trees, n_samples)
+        X = np.ascontiguousarray(X, dtype=np.float32 if self.float32_inputs else np.float64)
+        n_samples = X.shape[0]
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_samples) * X.shape[1])[None, :]
+        has_nan = np.isnan(flat_X).any()
+
+        node = np.repeat(self.roots[:, None], n_samples, axis=1)
+
+        for level in range(self.depth):
+            x = flat_X[row_offset + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_nan:
+                missing = np.isnan(x)
+                go_left[missing] = self.nan_left[node[missing]]
+            next_node = self.children[2 * node + go_left]
+            # Semua (pohon, sampel) sudah di leaf -> berhenti lebih awal
+            if level % 4 == 3 and np.array_equal(next_node, node):
+                break
+            node = next_node
+        return node
+
+    def predict_trees(self, X):
+        # Output per pohon untuk seluruh batch, tanpa memanggil estimator satu per satu
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        per_tree = self.predict_trees(X)
+        return per_tree.mean(axis=0) if self.aggregate == "mean" else per_tree.sum(axis=0)
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in ARRAY_FIELDS}
+
+    def meta(self):
+        return {"depth": self.depth, "aggregate": self.aggregate, "n_features": self.n_features,
+                "float32_inputs": self.float32_inputs}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        # np.asarray: array hasil np.load(mmap_mode="r") tetap menunjuk ke file, tanpa copy
+        return cls(**{name: np.asarray(arrays[name]) for name in ARRAY_FIELDS}, **meta)
+
+
+def _fold_scaler(feature, threshold, scaler, float32=False):
+    """Move split thresholds from scaled to raw feature units.
+
+    MinMaxScaler gives x_s = x * scale_ + min_, so x_s <= t is roughly
+    x <= (t - min_) / scale_. Rounding in the scaler (and sklearn's float32
+    cast when ``float32``) can move the boundary by a few ulps, so the exact
+    largest raw x that still goes left is found by bisection per node.
+    """
+    scale = scaler.scale_[feature]
+    offset = scaler.min_[feature]
+
+    def goes_left(x):
+        x_s = x * scale + offset
+        if float32:
+            x_s = x_s.astype(np.float32)
+        return x_s <= threshold
+
+    estimate = (threshold - offset) / scale
+    width = (np.abs(estimate) + np.abs(offset / scale) + 1e-300) * 1e-5
+    lo, hi = estimate - width, estimate + width
+    for _ in range(64):
+        bad = ~goes_left(lo) | goes_left(hi)
+        if not bad.any():
+            break
+        width = np.where(bad, width * 16, width)
+        lo, hi = estimate - width, estimate + width
+
+    # Invariant: goes_left(lo) benar, goes_left(hi) salah
+    for _ in range(2100):
+        mid = lo / 2 + hi / 2
+        open_gap = (mid > lo) & (mid < hi)
+        if not open_gap.any():
+            break
+        left = goes_left(mid)
+        lo = np.where(open_gap & left, mid, lo)
+        hi = np.where(open_gap & ~left, mid, hi)
+    return lo
+
+
+def _build(trees, aggregate, n_features, scaler, float32=False):
+    """Concatenate per-tree node arrays into one table with global indices.
+
+    Each entry of ``trees`` is (feature, threshold, left, right, value,
+    nan_left, is_leaf) with tree-local child indices.
+    """
+    parts = {name: [] for name in ("feature", "threshold", "children", "value", "nan_left")}
+    roots, depth, offset = [], 0, 0
+
+    for feature, threshold, left, right, value, nan_left, is_leaf in trees:
+        n = len(feature)
+        own = np.arange(n) + offset
+        feature = np.where(is_leaf, 0, feature)
+        threshold = np.where(is_leaf, np.inf, threshold).astype(np.float64)
+        if scaler is not None:
+            internal = ~is_leaf
+            threshold[internal] = _fold_scaler(feature[internal], threshold[internal], scaler, float32)
+        parts["feature"].append(feature.astype(np.int32))
+        parts["threshold"].append(threshold)
+        parts["children"].append(np.column_stack([
+            np.where(is_leaf, own, right + offset),
+            np.where(is_leaf, own, left + offset),
+        ]).astype(np.int32).ravel())
+        parts["value"].append(value.astype(np.float64))
+        parts["nan_left"].append(np.where(is_leaf, True, nan_left))
+        roots.append(offset)
+        depth = max(depth, _tree_depth(left, right, is_leaf))
+        offset += n
+
+    arrays = {name: np.concatenate(values) for name, values in parts.items()}
+    return CompiledEnsemble(**arrays, roots=np.array(roots, dtype=np.int32), depth=depth,
+                            aggregate=aggregate, n_features=n_features)
+
+
+def _tree_depth(left, right, is_leaf):
+    depth = np.zeros(len(left), dtype=int)
+    # Node anak selalu punya index lebih besar dari parent (sklearn & urutan DFS LightGBM)
+    for node in range(len(left)):
+        if not is_leaf[node]:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+# ================================
+# Konversi model
+# ================================
+def compile_rf(rf_model, scaler=None):
+    trees = []
+    for estimator in rf_model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        if hasattr(tree, "missing_go_to_left"):
+            nan_left = tree.missing_go_to_left.astype(bool)
+        else:
+            nan_left = np.zeros(tree.node_count, dtype=bool)   # sklearn lama: NaN selalu ke kanan
+        trees.append((tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                      tree.value[:, 0, 0], nan_left, is_leaf))
+
+    # sklearn membandingkan fitur dalam float32: tanpa scaler input ikut dicast ke float32,
+    # dengan scaler efek cast itu sudah masuk ke ambang hasil fold
+    ensemble = _build(trees, "mean", rf_model.n_features_in_, scaler, float32=True)
+    ensemble.float32_inputs = scaler is None
+    return ensemble
+
+
+def compile_lgbm(lgbm_model, scaler=None):
+    booster = getattr(lgbm_model, "booster_", lgbm_model)
+    dump = booster.dump_model()
+    if dump["num_tree_per_iteration"] != 1:
+        raise NotImplementedError("Hanya model regresi (satu pohon per iterasi) yang didukung")
+
+    trees = []
+    for info in dump["tree_info"]:
+        nodes = []
+
+        def visit(node):
+            # DFS pre-order: parent selalu mendapat index lebih kecil dari anaknya
+            idx = len(nodes)
+            nodes.append(None)
+            if "leaf_value" in node:
+                nodes[idx] = (0, 0.0, -1, -1, node["leaf_value"], True, True)
+                return idx
+            if node["decision_type"] != "<=" or node["missing_type"] == "Zero":
+                raise NotImplementedError(f"Split {node['decision_type']}/{node['missing_type']} belum didukung")
+            left = visit(node["left_child"])
+            right = visit(node["right_child"])
+            threshold = float(node["threshold"])
+            if node["missing_type"] == "NaN":
+                nan_left = node["default_left"]
+            else:
+                nan_left = 0.0 <= threshold   # missing_type None: NaN dianggap 0 (skala model)
+            nodes[idx] = (node["split_feature"], threshold, left, right, 0.0, nan_left, False)
+            return idx
+
+        visit(info["tree_structure"])
+        columns = list(zip(*nodes))
+        trees.append(tuple(np.array(column) for column in columns))
+
+    return _build(trees, "sum", dump["max_feature_idx"] + 1, scaler)
+
+
+# ================================
+# Benchmark latency per panggilan
+# ================================
+def benchmark(model, compiled, X_scaled, X_raw=None, repeat=50):
+    """Time ``model.predict`` against ``compiled.predict`` on the same batch.
+
+    ``X_raw`` is passed to the compiled model when its scaler is folded in.
+    Returns a dict with per-call milliseconds and the max absolute difference.
+    """
+    X_compiled = X_scaled if X_raw is None else X_raw
+
+    def per_call(fn, X):
+        fn(X)   # warm-up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(X)
+        return (time.perf_counter() - start) / repeat * 1000
+
+    original_ms = per_call(model.predict, X_scaled)
+    compiled_ms = per_call(compiled.predict, X_compiled)
+    max_abs_diff = float(np.max(np.abs(model.predict(X_scaled) - compiled.predict(X_compiled))))
+    return {"original_ms": original_ms, "compiled_ms": compiled_ms,
+            "speedup": original_ms / compiled_ms, "max_abs_diff": max_abs_diff}
+
+
+if __name__ == "__main__":
+    import joblib
+    import warnings
+    from Data import prepare_dataset
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    data = prepare_dataset()
+    scaler = joblib.load("scaler.pkl")
+    X_raw = data["X"].to_numpy()
+    X_scaled = scaler.transform(data["X"])
+
+    for name, path, compile_fn in [("RF", "RFM.pkl", compile_rf), ("LGBM", "LGBMM.pkl", compile_lgbm)]:
+        model = joblib.load(path)
+        compiled = compile_fn(model, scaler)
+        for batch in (1, 38, len(X_raw)):
+            result = benchmark(model, compiled, X_scaled[:batch], X_raw[:batch])
+            print(f"{name} batch={batch:5d}: predict {result['original_ms']:.2f} ms, "
+                  f"compiled {result['compiled_ms']:.2f} ms ({result['speedup']:.1f}x), "
+                  f"max |diff| {result['max_abs_diff']:.2e}")
@@ -0,0 +1,260 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Data import dataset_key, prepare_dataset
+
+DB_PATH = "tuning.db"
+
+# Fold time-ordered di dalam periode training: train = semua bulan sebelum start,
+# validasi = FOLD_MONTHS bulan berikutnya. Tahun test (2023-2024) tidak disentuh.
+FOLD_STARTS = ("2021-01-01", "2021-07-01", "2022-01-01", "2022-07-01")
+FOLD_MONTHS = 6
+
+# Parameter binning LightGBM tetap di semua trial supaya Dataset bisa dipakai ulang.
+# feature_pre_filter=False: min_child_samples boleh berubah tanpa membangun ulang Dataset.
+LGBM_DATASET_PARAMS = {"max_bin": 255, "feature_pre_filter": False, "verbose": -1}
+LGBM_MAX_ROUNDS = 2000
+LGBM_EARLY_STOPPING = 50
+
+# RF ditumbuhkan per RF_CHUNK pohon (warm_start) sampai RMSE validasi berhenti membaik
+RF_CHUNK = 50
+RF_MAX_TREES = 500
+RF_MIN_IMPROVEMENT = 0.002
+
+# Median pruning: trial dihentikan jika rata-rata fold sejauh ini lebih buruk dari
+# median trial selesai pada fold yang sama (setelah PRUNE_MIN_TRIALS trial selesai)
+PRUNE_MIN_TRIALS = 5
+
+
+# ================================
+# Ruang pencarian (deterministik per nomor trial, jadi bisa di-resume)
+# ================================
+def _sample_rf(rng):
+    return {
+        "max_depth": [None, 8, 12, 16, 24][rng.integers(5)],
+        "min_samples_leaf": int(rng.integers(1, 11)),
+        "max_features": [1.0, "sqrt", 0.3, 0.5, 0.7][rng.integers(5)],
+    }
+
+
+def _sample_lgbm(rng):
+    return {
+        "learning_rate": float(np.exp(rng.uniform(np.log(0.01), np.log(0.2)))),
+        "num_leaves": int(rng.integers(7, 128)),
+        "min_child_samples": int(rng.integers(5, 51)),
+        "colsample_bytree": float(rng.uniform(0.5, 1.0)),
+        "subsample": float(rng.uniform(0.5, 1.0)),
+        "subsample_freq": 1,
+        "reg_lambda": float(np.exp(rng.uniform(np.log(1e-3), np.log(10)))),
+    }
+
+
+SEARCH_SPACES = {"RF": _sample_rf, "LGBM": _sample_lgbm}
+
+
+def sample_params(model, number, seed=42):
+    return SEARCH_SPACES[model](np.random.default_rng([seed, number]))
+
+
+# ================================
+# Trial database (SQLite lokal)
+# ================================
+def _connect(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trials (
+            study TEXT, number INTEGER, params TEXT, state TEXT, value REAL,
+            fold_values TEXT, extra TEXT, updated TEXT,
+            PRIMARY KEY (study, number)
+        )""")
+    return conn
+
+
+def _save_trial(db_path, study, number, params, state, fold_values, value=None, extra=None):
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (study, number, json.dumps(params), state, value, json.dumps(fold_values),
+                      json.dumps(extra or {}), time.strftime("%Y-%m-%d %H:%M:%S")))
+
+
+def load_trials(study=None, db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=["study", "number", "params", "state", "value", "fold_values", "extra", "updated"])
+    with closing(_connect(db_path)) as conn:
+        trials = pd.read_sql("SELECT * FROM trials", conn)
+    if study is not None:
+        trials = trials[trials["study"] == study]
+    for col in ("params", "fold_values", "extra"):
+        trials[col] = trials[col].map(json.loads)
+    return trials.sort_values(["study", "number"]).reset_index(drop=True)
+
+
+def _should_prune(db_path, study, fold_values):
+    trials = load_trials(study, db_path)
+    done = trials[trials["state"] == "COMPLETE"]
+    if len(done) < PRUNE_MIN_TRIALS:
+        return False
+    k = len(fold_values)
+    reference = np.median([np.mean(values[:k]) for values in done["fold_values"]])
+    return np.mean(fold_values) > reference
+
+
+# ================================
+# Fold data (dibangun sekali per worker process)
+# ================================
+_fold_cache = {}
+
+
+def _folds(model):
+    if model in _fold_cache:
+        return _fold_cache[model]
+
+    data = prepare_dataset()
+    X, y = data["X_train_scaled"], data["y_train"]
+    dates = data["df"].loc[X.index, "Tanggal"]
+
+    folds = []
+    for start in pd.to_datetime(FOLD_STARTS):
+        train = (dates < start).to_numpy()
+        valid = ((dates >= start) & (dates < start + pd.DateOffset(months=FOLD_MONTHS))).to_numpy()
+        if model == "LGBM":
+            # Binning dilakukan sekali di sini; semua trial di worker ini memakai Dataset yang sama
+            train_set = lgb.Dataset(X[train], y[train], params=LGBM_DATASET_PARAMS, free_raw_data=False).construct()
+            valid_set = lgb.Dataset(X[valid], y[valid], params=LGBM_DATASET_PARAMS, reference=train_set).construct()
+            folds.append((train_set, valid_set))
+        else:
+            folds.append((X[train].to_numpy(np.float32), y[train].to_numpy(),
+                          X[valid].to_numpy(np.float32), y[valid].to_numpy()))
+
+    _fold_cache[model] = folds
+    return folds
+
+
+def _fit_lgbm_fold(params, fold):
+    train_set, valid_set = fold
+    booster = lgb.train({"objective": "regression", "metric": "rmse", "num_threads": 1, "seed": 42,
+                         "verbose": -1, **params},
+                        train_set, num_boost_round=LGBM_MAX_ROUNDS, valid_sets=[valid_set],
+                        callbacks=[lgb.early_stopping(LGBM_EARLY_STOPPING, verbose=False)])
+    return booster.best_score["valid_0"]["rmse"], booster.best_iteration
+
+
+def _fit_rf_fold(params, fold):
+    X_train, y_train, X_valid, y_valid = fold
+    rf_model = RandomForestRegressor(n_estimators=RF_CHUNK, warm_start=True, random_state=42, n_jobs=1, **params)
+
+    best_rmse, best_trees = np.inf, RF_CHUNK
+    for n_trees in range(RF_CHUNK, RF_MAX_TREES + 1, RF_CHUNK):
+        rf_model.set_params(n_estimators=n_trees)
+        rf_model.fit(X_train, y_train)
+        rmse = float(np.sqrt(np.mean((rf_model.predict(X_valid) - y_valid) ** 2)))
+        # Early stopping: pohon tambahan tidak lagi menurunkan error secara berarti
+        if rmse > best_rmse * (1 - RF_MIN_IMPROVEMENT):
+            break
+        best_rmse, best_trees = rmse, n_trees
+    return best_rmse, best_trees
+
+
+FIT_FOLD = {"RF": _fit_rf_fold, "LGBM": _fit_lgbm_fold}
+
+
+def _run_trial(args):
+    model, study, number, db_path = args
+    params = sample_params(model, number)
+    _save_trial(db_path, study, number, params, "RUNNING", [])
+
+    fold_values, sizes = [], []
+    try:
+        for k, fold in enumerate(_folds(model)):
+            rmse, size = FIT_FOLD[model](params, fold)
+            fold_values.append(rmse)
+            sizes.append(size)
+            _save_trial(db_path, study, number, params, "RUNNING", fold_values)
+            if k < len(FOLD_STARTS) - 1 and _should_prune(db_path, study, fold_values):
+                _save_trial(db_path, study, number, params, "PRUNED", fold_values)
+                return number, "PRUNED", None
+    except Exception as e:
+        _save_trial(db_path, study, number, params, "FAIL", fold_values, extra={"error": repr(e)})
+        return number, "FAIL", None
+
+    value = float(np.mean(fold_values))
+    # Jumlah pohon / boosting round untuk model final = rata-rata hasil early stopping
+    extra = {"n_estimators": int(round(np.mean(sizes)))}
+    _save_trial(db_path, study, number, params, "COMPLETE", fold_values, value, extra)
+    return number, "COMPLETE", value
+
+
+# ================================
+# Search
+# ================================
+def study_name(model, data_hash):
+    return f"{model}-{data_hash[:8]}"
+
+
+def run_search(model, n_trials=50, max_workers=None, db_path=DB_PATH):
+    """Random search for ``model`` ("RF" or "LGBM") over time-ordered CV folds.
+
+    Trials run concurrently in a process pool; each worker bins the fold
+    data once and reuses it for every trial it runs. LightGBM trials use
+    early stopping, RF trials stop adding trees once validation RMSE stops
+    improving, and weak trials are pruned against the median. Every trial is
+    written to a SQLite database, so rerunning the same search resumes it:
+    finished trials are skipped and interrupted ones are rerun. Returns the
+    study's trials as a DataFrame.
+    """
+    data = prepare_dataset()    # feature cache siap sebelum worker dibuat
+    study = study_name(model, dataset_key(**data["config"]))
+    _connect(db_path).close()
+
+    trials = load_trials(study, db_path)
+    finished = set(trials.loc[trials["state"].isin(["COMPLETE", "PRUNED"]), "number"])
+    pending = [number for number in range(n_trials) if number not in finished]
+
+    tasks = [(model, study, number, db_path) for number in pending]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        for number, state, value in pool.map(_run_trial, tasks):
+            print(f"{study} trial {number}: {state}" + (f" RMSE {value:,.1f}" if value is not None else ""))
+
+    return load_trials(study, db_path)
+
+
+def best_params(model, data_hash=None, db_path=DB_PATH):
+    """Best finished params for ``model``, ready for ``train_rf``/``train_lgbm``.
+
+    Uses the study for ``data_hash`` when given, otherwise the most recently
+    updated study of that model. Returns ``{}`` when nothing has been tuned.
+    """
+    trials = load_trials(db_path=db_path)
+    trials = trials[(trials["state"] == "COMPLETE") & trials["study"].str.startswith(f"{model}-")]
+    if data_hash is not None:
+        trials = trials[trials["study"] == study_name(model, data_hash)]
+    elif not trials.empty:
+        trials = trials[trials["study"] == trials.sort_values("updated")["study"].iloc[-1]]
+    if trials.empty:
+        return {}
+
+    best = trials.loc[trials["value"].idxmin()]
+    return {**best["params"], **best["extra"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter search RF / LightGBM dengan CV time-series")
+    parser.add_argument("model", choices=sorted(SEARCH_SPACES))
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    trials = run_search(args.model, args.trials, args.workers)
+    print(trials["state"].value_counts().to_string())
+    print("Best params:", best_params(args.model, trials["study"].iloc[0].split("-", 1)[1]))
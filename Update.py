@@ -0,0 +1,177 @@
+import argparse
+import os
+
+import joblib
+import lightgbm as lgb
+import pandas as pd
+
+import Artifacts
+import Ingest
+import LGBM
+import RF
+import Trace
+from Data import TARGET, build_features, cache_prepared, dataset_key, load_raw, prepare_dataset
+from Forecast import BAND_QUANTILES, DISTRICT_PATH, PROVINCE_PATH, aggregate_province, forecast_districts
+
+# Warm start LightGBM: jumlah boosting round tambahan dan jendela data terbaru yang dipakai
+UPDATE_ROUNDS = 20
+WINDOW_MONTHS = 12
+
+
+# ================================
+# 1-2. Tambah baris baru + fitur lag hanya untuk ekor tiap kabupaten
+# ================================
+def extend_features(data, raw, new_keys):
+    """Add feature rows for ``new_keys`` (Kabupaten_Kota + Tanggal) to ``data``.
+
+    Lags are computed from the last ``max_lag`` months before the earliest
+    new month only, and the new rows are scaled with the existing scaler, so
+    the rows already in ``data`` (and the models trained on them) stay valid.
+    """
+    config = data["config"]
+    max_lag = max(config["lag_window"], *config["spatial_lags"])
+    start = new_keys["Tanggal"].min() - pd.DateOffset(months=max_lag)
+    tail = raw[raw["Tanggal"] >= start]
+
+    tail_df, _ = build_features(tail, config["lag_window"], config["lag_blocks"], 0,
+                                config["spatial"], config["spatial_lags"])
+    # Index baris tetap index raw, sama seperti hasil build penuh
+    keys = pd.MultiIndex.from_arrays([tail_df["Kabupaten_Kota"].astype(str), tail_df["Tanggal"]])
+    new_df = tail_df[keys.isin(pd.MultiIndex.from_frame(new_keys))]
+    old_df, new_df = _align_districts(data["df"], new_df)
+
+    with Trace.span("scaling"):
+        X_new = new_df[data["features"]]
+        X_new_scaled = pd.DataFrame(data["scaler"].transform(X_new), columns=data["features"], index=new_df.index)
+
+    year = new_df["Tanggal"].dt.year
+    train_mask = year.between(*config["train_years"])
+    test_mask = year.between(*config["test_years"])
+
+    y_new = new_df[TARGET]
+    return {
+        **data,
+        "df": pd.concat([old_df, new_df]),
+        "X": pd.concat([data["X"], X_new]),
+        "y": pd.concat([data["y"], y_new]),
+        "X_scaled": pd.concat([data["X_scaled"], X_new_scaled]),
+        "X_train_scaled": pd.concat([data["X_train_scaled"], X_new_scaled[train_mask]]),
+        "y_train": pd.concat([data["y_train"], y_new[train_mask]]),
+        "X_test_scaled": pd.concat([data["X_test_scaled"], X_new_scaled[test_mask]]),
+        "y_test": pd.concat([data["y_test"], y_new[test_mask]]),
+    }
+
+
+def _align_districts(old_df, new_df):
+    # Kategori kabupaten disamakan supaya concat tidak jatuh ke dtype object
+    old, new = old_df["Kabupaten_Kota"], new_df["Kabupaten_Kota"]
+    if not (isinstance(old.dtype, pd.CategoricalDtype) and isinstance(new.dtype, pd.CategoricalDtype)):
+        return old_df, new_df
+    categories = old.cat.categories.append(new.cat.categories.difference(old.cat.categories))
+    dtype = pd.CategoricalDtype(categories)
+    return (old_df.assign(Kabupaten_Kota=old.astype(dtype)),
+            new_df.assign(Kabupaten_Kota=new.astype(dtype)))
+
+
+# ================================
+# 3. Lanjutkan training LightGBM dari booster lama
+# ================================
+def continue_lgbm(model, X, y, rounds=UPDATE_ROUNDS):
+    # Booster lama dipakai sebagai init_model; hanya `rounds` pohon baru yang dilatih
+    params = {**model.get_params(), "n_estimators": rounds, "verbose": -1}
+    updated = lgb.LGBMRegressor(**params)
+    with Trace.span("fit.lgbm_warm_start", rows=len(X), rounds=rounds):
+        updated.fit(X, y, init_model=model.booster_)
+    return updated
+
+
+def _recent(data, months):
+    dates = data["df"].loc[data["X_scaled"].index, "Tanggal"]
+    recent = dates >= dates.max() - pd.DateOffset(months=months - 1)
+    return data["X_scaled"][recent.to_numpy()], data["y"][recent.to_numpy()]
+
+
+# ================================
+# 4. Forecast ulang hanya untuk kabupaten yang inputnya berubah
+# ================================
+def refresh_forecasts(df, store, districts=None, district_path=DISTRICT_PATH, province_path=PROVINCE_PATH):
+    """Recompute forecasts for ``districts`` (all if None) and merge them into the CSVs."""
+    subset = df if districts is None else df[df["Kabupaten_Kota"].isin(districts)]
+    fresh = forecast_districts(subset, store.features, None, store.rf, store.lgbm, clip_negative=True,
+                               quantiles=BAND_QUANTILES, lgbm_quantile_models=store.lgbm_quantiles)
+
+    if districts is not None and os.path.exists(district_path):
+        old = pd.read_csv(district_path, parse_dates=["Tanggal"])
+        fresh = pd.concat([old[~old["Kabupaten_Kota"].isin(districts)], fresh], ignore_index=True)
+
+    fresh.to_csv(district_path, index=False)
+    aggregate_province(fresh).to_csv(province_path, index=False)
+    return fresh
+
+
+def update(new_csv_path, warm_start=True, rounds=UPDATE_ROUNDS, window_months=WINDOW_MONTHS,
+           csv_path=Ingest.CSV_PATH, path=Ingest.DATASET_PATH):
+    """Append one batch of new observations and refresh everything downstream.
+
+    1. the new rows are appended to ``Limao.csv`` / ``Limao.arrow``;
+    2. lag features are computed for the new rows only and added to the
+       feature cache under the new dataset hash;
+    3. with ``warm_start``, LightGBM (and its quantile models) continue from
+       the existing boosters on the last ``window_months`` months, and a new
+       artifact version is published;
+    4. forecasts are recomputed for all districts when the batch moves the
+       last month forward or the models changed; a batch that only fills in
+       months already covered refreshes just the districts it touches.
+
+    The RF is left as is; it is refit by the full Train.py run.
+    """
+    data = prepare_dataset(path)    # versi sebelum append (dari feature cache)
+    last_month = data["df"]["Tanggal"].max()
+
+    with Trace.span("update.append"):
+        new = Ingest.append(new_csv_path, csv_path, path).to_pandas()
+    new_keys = new[["Kabupaten_Kota", "Tanggal"]].astype({"Kabupaten_Kota": str})
+    print(f"Appended {len(new)} rows ({new_keys['Tanggal'].min():%Y-%m} - {new_keys['Tanggal'].max():%Y-%m})")
+
+    with Trace.span("update.features"):
+        raw = load_raw(path)
+        data = extend_features(data, raw, new_keys)
+        cache_prepared(data, path)
+
+    store = Artifacts.open_store()
+    changed = sorted(new_keys["Kabupaten_Kota"].unique())
+    if new_keys["Tanggal"].max() > last_month:
+        changed = None      # bulan terakhir maju: forecast semua kabupaten mulai dari bulan berikutnya
+    if warm_start:
+        X_recent, y_recent = _recent(data, window_months)
+        lgbm_model = continue_lgbm(joblib.load(LGBM.MODEL_PATH), X_recent, y_recent, rounds)
+        joblib.dump(lgbm_model, LGBM.MODEL_PATH)
+
+        lgbm_quantiles = {}
+        for q in store.lgbm_quantiles:
+            model_path = LGBM.quantile_model_path(q)
+            if os.path.exists(model_path):
+                lgbm_quantiles[q] = continue_lgbm(joblib.load(model_path), X_recent, y_recent, rounds)
+                joblib.dump(lgbm_quantiles[q], model_path)
+
+        version = Artifacts.publish(data["features"], data["scaler"], joblib.load(RF.MODEL_PATH), lgbm_model,
+                                    data_hash=dataset_key(path, **data["config"]), metrics=store.metrics,
+                                    lgbm_quantiles=lgbm_quantiles)
+        store = Artifacts.open_store(version)
+        changed = None      # model berubah: semua forecast ikut berubah
+        print(f"LightGBM +{rounds} rounds on {len(X_recent)} recent rows -> artifacts {version}")
+
+    with Trace.span("update.forecast"):
+        forecasts = refresh_forecasts(data["df"], store, changed)
+    print(f"Refreshed forecasts for {'all' if changed is None else len(changed)} districts")
+    return forecasts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tambah data bulan baru tanpa rebuild penuh")
+    parser.add_argument("new_csv", help="CSV dengan skema Limao.csv, hanya baris baru")
+    parser.add_argument("--no-warm-start", action="store_true", help="Model tidak diperbarui")
+    parser.add_argument("--rounds", type=int, default=UPDATE_ROUNDS)
+    args = parser.parse_args()
+
+    update(args.new_csv, warm_start=not args.no_warm_start, rounds=args.rounds)
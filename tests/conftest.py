@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def limao(tmp_path):
+    # Potongan kecil Limao.csv (4 kabupaten) di direktori sementara
+    df = pd.read_csv(os.path.join(ROOT, "Limao.csv"))
+    df = df[df["Kabupaten_Kota"].isin(df["Kabupaten_Kota"].unique()[:4])]
+    path = tmp_path / "Limao.csv"
+    df.to_csv(path, index=False)
+    return df, path
+
+
+@pytest.fixture
+def prepared(limao, tmp_path):
+    # Dataset siap-pakai (fitur + scaler + split) dari potongan Limao.csv, tanpa feature cache
+    import Ingest
+    from Data import prepare_dataset
+
+    _, csv_path = limao
+    arrow_path = tmp_path / "Limao.arrow"
+    Ingest.ingest(csv_path, arrow_path)
+    return prepare_dataset(arrow_path, use_cache=False)
+
+
+def fit_models(X, y):
+    # RF & LightGBM kecil: cukup untuk uji kesetaraan, cepat di-fit
+    import LGBM
+    import RF
+
+    rf_model = RF.train_rf(X, y, n_estimators=20, max_depth=8, n_jobs=1)
+    lgbm_model = LGBM.train_lgbm(X, y, n_estimators=30, num_leaves=15, n_jobs=1, verbose=-1)
+    return rf_model, lgbm_model
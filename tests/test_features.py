@@ -0,0 +1,37 @@
+import numpy as np
+
+import Ingest
+from Data import LagPanel, build_features
+
+
+def test_lag_panel_matches_build_features(limao):
+    _, csv_path = limao
+    raw = Ingest.restore_precision(Ingest.read_csv(csv_path).to_pandas())
+    # Urutan baris diacak: keduanya harus mengikuti urutan baris per kabupaten yang sama
+    raw = raw.sample(frac=1, random_state=0).sort_values("Tanggal", kind="stable")
+
+    df, features = build_features(raw)
+    panel = LagPanel(raw)
+
+    assert panel.features == features
+    # Panel dikelompokkan per kabupaten; baris dicocokkan lewat label index raw
+    assert sorted(panel.index) == sorted(df.index)
+    df = df.loc[panel.index]
+    np.testing.assert_array_equal(panel.matrix(), df[features].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(panel.y, df["Produksi_Padi_Ton_clean"].to_numpy())
+
+
+def test_lag_panel_scaler_matches_min_max_scaler(limao):
+    from sklearn.preprocessing import MinMaxScaler
+
+    _, csv_path = limao
+    raw = Ingest.restore_precision(Ingest.read_csv(csv_path).to_pandas())
+    df, features = build_features(raw)
+    panel = LagPanel(raw)
+
+    expected = MinMaxScaler().fit(df[features].to_numpy(dtype=np.float32))
+    scaler = panel.fit_scaler()
+    np.testing.assert_allclose(scaler.data_min_, expected.data_min_)
+    np.testing.assert_allclose(scaler.data_max_, expected.data_max_)
+    np.testing.assert_allclose(panel.matrix(scaler=scaler), expected.transform(panel.matrix()), atol=1e-6)
+    assert list(scaler.feature_names_in_) == features
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from conftest import fit_models
+from Data import CLIMATE_COLS, TARGET
+from Forecast import PRED_COLS, forecast_districts
+
+
+def baseline_forecast(df, features, scaler, rf_model, lgbm_model, periods):
+    # Loop asli 1yPK.py: per kabupaten, per bulan, fitur lag dibangun ulang dari seluruh riwayat
+    future_dates = pd.date_range(start=df["Tanggal"].max() + pd.offsets.MonthBegin(), periods=periods, freq="MS")
+    rows = []
+    for kab in df["Kabupaten_Kota"].unique():
+        current_df = df[df["Kabupaten_Kota"] == kab].copy()
+        for date in future_dates:
+            new_row = {col: np.nan for col in current_df.columns}
+            new_row["Tanggal"] = date
+            new_row["Kabupaten_Kota"] = kab
+            current_df = pd.concat([current_df, pd.DataFrame([new_row])], ignore_index=True)
+
+            for i in range(1, 13):
+                for col in [TARGET] + CLIMATE_COLS:
+                    current_df[f"{col}_lag_{i}"] = current_df[col].shift(i)
+            month = current_df["Tanggal"].dt.month
+            current_df["Month_sin"] = np.sin(2 * np.pi * month / 12)
+            current_df["Month_cos"] = np.cos(2 * np.pi * month / 12)
+
+            X_latest = scaler.transform(current_df[features].iloc[-1:])
+            y_rf = rf_model.predict(X_latest)[0]
+            y_lgbm = lgbm_model.predict(X_latest)[0]
+            y_blend = (y_rf + y_lgbm) / 2
+            rows.append({"Kabupaten_Kota": kab, "Tanggal": date, "RF_Pred": max(0, y_rf),
+                         "LGBM_Pred": max(0, y_lgbm), "Blended_Pred": max(0, y_blend)})
+            current_df.loc[current_df.index[-1], TARGET] = y_blend
+    return pd.DataFrame(rows)
+
+
+def test_forecast_districts_matches_baseline_loop(prepared):
+    data = prepared
+    rf_model, lgbm_model = fit_models(data["X_train_scaled"].to_numpy(), data["y_train"])
+
+    expected = baseline_forecast(data["df"], data["features"], data["scaler"], rf_model, lgbm_model, periods=6)
+    result = forecast_districts(data["df"], data["features"], data["scaler"], rf_model, lgbm_model,
+                                periods=6, clip_negative=True)
+
+    assert list(result["Kabupaten_Kota"].astype(str)) == list(expected["Kabupaten_Kota"].astype(str))
+    assert list(result["Tanggal"]) == list(expected["Tanggal"])
+    np.testing.assert_allclose(result[PRED_COLS].to_numpy(), expected[PRED_COLS].to_numpy(), rtol=1e-9)
+
+
+def test_forecast_districts_with_named_features(prepared):
+    # Model dari Train.py di-fit dengan DataFrame; hasil harus sama dengan model dari ndarray
+    data = prepared
+    named = fit_models(data["X_train_scaled"], data["y_train"])
+    plain = fit_models(data["X_train_scaled"].to_numpy(), data["y_train"])
+
+    a = forecast_districts(data["df"], data["features"], data["scaler"], *named, periods=3)
+    b = forecast_districts(data["df"], data["features"], data["scaler"], *plain, periods=3)
+    pd.testing.assert_frame_equal(a, b)
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import Ingest
+from Data import build_features, load_raw
+
+
+def _split(df, tmp_path, months=2):
+    # Riwayat tanpa `months` bulan terakhir + batch berisi bulan-bulan tersebut
+    cutoff = sorted(df["Tanggal"].unique())[-months]
+    history_path, batch_path = tmp_path / "history.csv", tmp_path / "batch.csv"
+    df[df["Tanggal"] < cutoff].to_csv(history_path, index=False)
+    batch = df[df["Tanggal"] >= cutoff]
+    return history_path, batch_path, batch
+
+
+def test_append_out_of_order_batch_matches_full_ingest(limao, tmp_path):
+    df, full_csv = limao
+    history_csv, batch_csv, batch = _split(df, tmp_path)
+    # Baris terbalik (bulan terakhir dulu) dan kolom dalam urutan lain
+    batch.iloc[::-1][batch.columns[::-1]].to_csv(batch_csv, index=False)
+
+    arrow_path = tmp_path / "history.arrow"
+    Ingest.ingest(history_csv, arrow_path)
+    Ingest.append(batch_csv, history_csv, arrow_path)
+
+    key = ["Kabupaten_Kota", "Tanggal"]
+    appended, _ = build_features(load_raw(arrow_path))
+    full, _ = build_features(Ingest.restore_precision(Ingest.read_csv(full_csv).to_pandas()))
+    appended = appended.astype({"Kabupaten_Kota": str}).sort_values(key).reset_index(drop=True)
+    full = full.astype({"Kabupaten_Kota": str}).sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(appended, full, check_categorical=False)
+
+    # CSV ikut bertambah dan dapat di-ingest ulang menjadi tabel yang sama
+    rebuilt = Ingest.read_csv(history_csv).to_pandas().astype({"Kabupaten_Kota": str, "Bulan": str})
+    stored = Ingest.load_table(arrow_path).to_pandas().astype({"Kabupaten_Kota": str, "Bulan": str})
+    pd.testing.assert_frame_equal(rebuilt, stored)
+
+
+def test_append_rejects_backfill(limao, tmp_path):
+    df, _ = limao
+    history_csv, batch_csv, batch = _split(df, tmp_path)
+    arrow_path = tmp_path / "history.arrow"
+    Ingest.ingest(history_csv, arrow_path)
+
+    # Bulan yang sudah ada untuk kabupaten ini (di-drop dulu supaya tidak duplikat)
+    district = df["Kabupaten_Kota"].iloc[0]
+    first_month = df[df["Kabupaten_Kota"] == district]["Tanggal"].min()
+    backfill = df[(df["Kabupaten_Kota"] == district) & (df["Tanggal"] == first_month)]
+    backfill.assign(Tanggal="2017-12-01", Tahun=2017, Bulan="Desember").to_csv(batch_csv, index=False)
+
+    size = history_csv.stat().st_size
+    with pytest.raises(ValueError, match="tidak setelah bulan terakhirnya"):
+        Ingest.append(batch_csv, history_csv, arrow_path)
+    assert history_csv.stat().st_size == size
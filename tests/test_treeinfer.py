@@ -0,0 +1,35 @@
+import numpy as np
+
+from conftest import fit_models
+from TreeInfer import compile_lgbm, compile_rf
+
+
+def test_compiled_models_match_predict(prepared):
+    data = prepared
+    rf_model, lgbm_model = fit_models(data["X_train_scaled"], data["y_train"])
+    X = data["X_test_scaled"]
+
+    np.testing.assert_allclose(compile_rf(rf_model).predict(X), rf_model.predict(X), rtol=1e-9)
+    np.testing.assert_allclose(compile_lgbm(lgbm_model).predict(X), lgbm_model.predict(X), rtol=1e-9)
+
+
+def test_compiled_models_with_folded_scaler(prepared):
+    # Scaler di-fold ke threshold: input mentah memberi prediksi yang sama dengan input ter-scale
+    data = prepared
+    rf_model, lgbm_model = fit_models(data["X_train_scaled"], data["y_train"])
+    X_raw = data["X"].loc[data["X_test_scaled"].index]
+    X = data["X_test_scaled"]
+
+    np.testing.assert_allclose(compile_rf(rf_model, data["scaler"]).predict(X_raw), rf_model.predict(X),
+                               rtol=1e-9)
+    np.testing.assert_allclose(compile_lgbm(lgbm_model, data["scaler"]).predict(X_raw), lgbm_model.predict(X),
+                               rtol=1e-9)
+
+
+def test_compiled_rf_trees_match_estimators(prepared):
+    data = prepared
+    rf_model, _ = fit_models(data["X_train_scaled"], data["y_train"])
+    X = data["X_test_scaled"]
+
+    expected = np.stack([tree.predict(X.to_numpy()) for tree in rf_model.estimators_])
+    np.testing.assert_allclose(compile_rf(rf_model).predict_trees(X), expected, rtol=1e-9)
@@ -0,0 +1,63 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+import Artifacts
+import Ingest
+import LGBM
+import RF
+import Update
+from conftest import fit_models
+from Data import dataset_key, prepare_dataset
+from Forecast import forecast_districts
+
+
+def _setup_store(limao, tmp_path, monkeypatch):
+    # Repo mini di tmp_path: Limao.csv tanpa dua bulan terakhir, model kecil, satu versi artifact
+    monkeypatch.chdir(tmp_path)
+    df, _ = limao
+    months = sorted(df["Tanggal"].unique())
+    df[df["Tanggal"] < months[-2]].to_csv(Ingest.CSV_PATH, index=False)
+    # Batch pertama sengaja dalam urutan terbalik
+    df[df["Tanggal"] == months[-2]].iloc[::-1].to_csv("batch1.csv", index=False)
+    df[df["Tanggal"] == months[-1]].to_csv("batch2.csv", index=False)
+
+    Ingest.ingest()
+    data = prepare_dataset()
+    rf_model, lgbm_model = fit_models(data["X_train_scaled"], data["y_train"])
+    joblib.dump(rf_model, RF.MODEL_PATH)
+    joblib.dump(lgbm_model, LGBM.MODEL_PATH)
+    Artifacts.publish(data["features"], data["scaler"], rf_model, lgbm_model, data_hash=dataset_key())
+    return df, months
+
+
+def test_update_matches_full_rebuild(limao, tmp_path, monkeypatch):
+    df, months = _setup_store(limao, tmp_path, monkeypatch)
+
+    forecasts = Update.update("batch1.csv", warm_start=False)
+
+    # Fitur inkremental (feature cache) == rebuild penuh dari dataset yang sudah di-append
+    cached, full = prepare_dataset(), prepare_dataset(use_cache=False)
+    pd.testing.assert_frame_equal(cached["X"].sort_index(), full["X"].sort_index())
+    pd.testing.assert_series_equal(cached["y"].sort_index(), full["y"].sort_index())
+
+    # Bulan terakhir maju: semua kabupaten di-forecast dari bulan setelahnya
+    assert forecasts["Kabupaten_Kota"].nunique() == df["Kabupaten_Kota"].nunique()
+    assert forecasts["Tanggal"].min() == pd.Timestamp(months[-2]) + pd.offsets.MonthBegin()
+    store = Artifacts.open_store()
+    expected = forecast_districts(full["df"], store.features, None, store.rf, store.lgbm, clip_negative=True)
+    np.testing.assert_allclose(forecasts["Blended_Pred"].to_numpy(), expected["Blended_Pred"].to_numpy(),
+                               rtol=1e-9)
+
+
+def test_update_warm_start_publishes_new_version(limao, tmp_path, monkeypatch):
+    df, months = _setup_store(limao, tmp_path, monkeypatch)
+    Update.update("batch1.csv", warm_start=False)
+
+    before = Artifacts.list_versions()
+    forecasts = Update.update("batch2.csv", warm_start=True, rounds=5)
+
+    assert len(Artifacts.list_versions()) == len(before) + 1
+    assert Artifacts.open_store().manifest["data_hash"] == dataset_key()
+    assert forecasts["Tanggal"].min() == pd.Timestamp(months[-1]) + pd.offsets.MonthBegin()
+    assert len(Ingest.load_table()) == len(df)
@@ -0,0 +1,47 @@
+import plotly.express as px
+import streamlit as st
+
+import Cube
+import Dashboard
+import MapData
+import Store
+
+
+@st.cache_resource
+def load_map_geometry():
+    return MapData.load_geometry()
+
+
+@st.cache_resource
+def choropleth_figure(version):
+    geojson, ids = load_map_geometry()
+    cube = Dashboard.load_cube()
+    totals = MapData.production_by_district(cube["by_district"].reset_index(),
+                                            value_col=f"{Cube.TARGET}_sum")
+    values = MapData.values_for(ids, totals)
+
+    # Plot Choropleth Map: geometri + array nilai per id fitur
+    fig = px.choropleth_mapbox(
+        geojson=geojson,
+        locations=ids,
+        color=values,
+        hover_name=ids,
+        labels={"color": "Produksi_Padi_Ton_clean"},
+        mapbox_style="carto-positron",
+        center={"lat": -7.5, "lon": 112},
+        zoom=6,
+        color_continuous_scale="Blues"
+    )
+    return fig
+
+
+# ====== Choropleth Map ======
+st.subheader("🗺️ Choropleth Maps Produksi Padi Jawa Timur")
+
+st.markdown("""
+    ℹ️ **Catatan:** Peta ini menampilkan total produksi padi kumulatif
+    untuk tahun **2018 - 2024**, dijumlahkan per kabupaten/kota.
+    """)
+
+# Geometri + nilai sudah di-cache (dibagi ke semua sesi), rerun tidak membaca ulang GeoJSON
+st.plotly_chart(choropleth_figure(Store.version("limao")), use_container_width=True)
@@ -0,0 +1,8 @@
+import streamlit as st
+
+import Dashboard
+
+# ====== Distribusi ======
+st.subheader("📦 Distribusi Produksi Padi & Outlier")
+fig = Dashboard.box_figure("Produksi_Padi_Ton_clean")
+st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,68 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import Dashboard
+import Service
+
+# ====== Forecast On-Demand ======
+st.subheader("🛰️ Forecast On-Demand")
+st.caption("Forecast dihitung di background worker; kombinasi yang sudah pernah dihitung langsung diambil dari cache.")
+
+data = Dashboard.load_data()
+kabupaten_list = sorted(data["Kabupaten_Kota"].astype(str).unique())
+next_month = Service.last_month() + pd.offsets.MonthBegin()
+start_options = list(pd.date_range(end=next_month, periods=25, freq="MS"))
+
+col1, col2 = st.columns(2)
+periods = col1.slider("Horizon (bulan):", 1, 24, 12)
+start = col2.selectbox("Bulan mulai forecast:", start_options, index=len(start_options) - 1,
+                       format_func=lambda d: d.strftime("%Y-%m"))
+selected = st.multiselect("Kabupaten/Kota (kosong = semua):", kabupaten_list)
+
+if st.button("Jalankan Forecast"):
+    job = Service.request(periods, start, selected or None)
+    st.session_state["forecast_job"] = job
+
+
+@st.fragment(run_every=1.0)
+def show_progress(job):
+    # Hanya fragment ini yang di-rerun tiap detik selama job berjalan; selesai -> satu rerun penuh
+    if job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"Menghitung forecast... ({job.status})")
+
+
+def show_result(job):
+    source = "cache" if job.cached else f"dihitung dalam {job.seconds:.1f} s"
+    st.success(f"{job.start:%Y-%m} + {job.periods} bulan, {job.result['Kabupaten_Kota'].nunique()} "
+               f"kabupaten/kota ({source}).")
+
+    province = job.province
+    fig = px.line(province, x="Tanggal", y=["RF_Pred", "LGBM_Pred", "Blended_Pred"], markers=True,
+                  labels={"value": "Produksi (Ton)", "variable": "Model"},
+                  title="Total Kabupaten/Kota Terpilih")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Data aktual pada periode yang sama (jika bulan mulai berada di masa lalu)
+    actual = data[data["Tanggal"].between(province["Tanggal"].min(), province["Tanggal"].max())]
+    if job.districts is not None:
+        actual = actual[actual["Kabupaten_Kota"].astype(str).isin(job.districts)]
+    if not actual.empty:
+        st.markdown("### Aktual vs Prediksi (Blended)")
+        actual_total = actual.groupby("Tanggal")["Produksi_Padi_Ton_clean"].sum().rename("Aktual")
+        st.line_chart(province.set_index("Tanggal")[["Blended_Pred"]].join(actual_total))
+
+    st.markdown("### 📅 Detail per Kabupaten/Kota")
+    st.dataframe(job.result, use_container_width=True)
+    st.download_button("Unduh CSV", job.result.to_csv(index=False), file_name=f"forecast_{job.key}.csv")
+
+
+job = st.session_state.get("forecast_job")
+if job is not None:
+    if not job.done:
+        show_progress(job)
+    elif job.status == "failed":
+        st.error(f"Forecast gagal: {job.error}")
+    else:
+        show_result(job)
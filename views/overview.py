@@ -0,0 +1,42 @@
+import plotly.express as px
+import streamlit as st
+
+import Dashboard
+
+# ====== DASHBOARD OVERVIEW ======
+st.subheader("📊 Ringkasan Produksi Padi")
+cube = Dashboard.load_cube()
+
+# KPI Cards
+kpi = cube["kpi"]
+total_produksi = kpi["total_produksi"]
+produksi_rata = kpi["produksi_rata"]
+kabupaten = kpi["kabupaten"]
+tahun_terakhir = kpi["tahun_terakhir"]
+produksi_terakhir = kpi["produksi_terakhir"]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Total Produksi", f"{total_produksi:,.0f} ton")
+col2.metric("Rata-rata Produksi", f"{produksi_rata:,.0f} ton")
+col3.metric("Jumlah Kabupaten", kabupaten)
+col4.metric(f"Produksi {tahun_terakhir}", f"{produksi_terakhir:,.0f} ton")
+
+# Trend Produksi mini chart
+st.markdown("### 📈 Trend Produksi Tahunan")
+trend = cube["trend"]
+fig = px.line(trend, x="Tahun", y="Produksi_Padi_Ton_clean", markers=True)
+fig.update_layout(height=300, margin=dict(l=20, r=20, t=20, b=20))
+st.plotly_chart(fig, use_container_width=True)
+
+# Dua grafik kecil sejajar
+col5, col6 = st.columns(2)
+
+with col5:
+    st.markdown("### 🌦️ Curah Hujan vs Produksi")
+    fig = Dashboard.scatter_figure("Curah_Hujan_mm_clean", "Produksi_Padi_Ton_clean")
+    st.plotly_chart(fig, use_container_width=True)
+
+with col6:
+    st.markdown("### 📦 Distribusi Produksi (Boxplot)")
+    fig = Dashboard.box_figure("Produksi_Padi_Ton_clean")
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import Backtest
+import Store
+
+
+@st.cache_data
+def load_backtest():
+    return Backtest.load_results()
+
+
+# ====== Prediksi Produksi ======
+st.subheader("🤖 Prediksi Produksi Padi Tahun 2025")
+
+# Load hasil prediksi
+pred_df = Store.frame("prediction").sort_values("Tanggal")
+
+# Metric Cards - Total Produksi per Model
+total_rf = pred_df["RF_Pred"].sum()
+total_lgbm = pred_df["LGBM_Pred"].sum()
+total_blend = pred_df["Blended_Pred"].sum()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Random Forest", f"{total_rf:,.0f} ton")
+col2.metric("LightGBM", f"{total_lgbm:,.0f} ton")
+col3.metric("Blended", f"{total_blend:,.0f} ton")
+
+# Line chart per model
+fig = px.line(
+    pred_df,
+    x="Tanggal",
+    y=["RF_Pred", "LGBM_Pred", "Blended_Pred"],
+    markers=True,
+    color_discrete_map={
+        "RF_Pred": "orange",
+        "LGBM_Pred": "green",
+        "Blended_Pred": "blue"
+    },
+    labels={"value": "Produksi (Ton)", "variable": "Model"}
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# Tabel hasil prediksi
+st.markdown("### 📅 Detail Prediksi 2025")
+st.dataframe(pred_df, use_container_width=True)
+
+# Tabel RMSE & SMAPE
+# Model klasik masih hardcoded; model non-linear diambil dari hasil Backtest.py jika ada
+st.markdown("### 📊 Perbandingan Kinerja Model")
+eval_df = pd.DataFrame({
+    "Kelas Model": [
+        "Baseline Klasik", "Spasial Klasik", "Spasial + Iklim",
+        "Non-Linear", "Non-Linear", "Non-Linear Hibrida"
+    ],
+    "Model Spesifik": [
+        "STARMA", "GSTARIMA (Invers Jarak)", "GSTARIMAX",
+        "Random Forest", "LightGBM", "Blended (RF + LGBM)"
+    ],
+    "RMSE (Ton)": ["~20,800", "~20,278", "~20,200", "~17,000", "~16,400", "~16,389"],
+    "SMAPE (%)": ["~75%", "~73%", "~72%", "~66%", "~56%", "~60%"]
+})
+
+if os.path.exists(Backtest.RESULTS_PATH):
+    backtest = load_backtest()
+    summary = Backtest.summarize(backtest)
+    for row, model in zip([3, 4, 5], ["RF", "LGBM", "Blended"]):
+        eval_df.loc[row, "RMSE (Ton)"] = f"{summary[f'{model}_RMSE']:,.0f}"
+        eval_df.loc[row, "SMAPE (%)"] = f"{summary[f'{model}_SMAPE']:.0f}%"
+    st.caption(
+        f"Model non-linear: walk-forward backtest {backtest['fold'].nunique()} fold, "
+        f"horizon 1-{backtest['horizon'].max()} bulan (Backtest.py)."
+    )
+st.table(eval_df)
+
+##################################################################################################################################
+##################################################################################################################################
+
+# --- Bersihkan angka dari string ---
+eval_clean = eval_df.copy()
+eval_clean["RMSE (Ton)"] = eval_clean["RMSE (Ton)"].str.replace("~", "").str.replace(",", "").astype(float)
+eval_clean["SMAPE (%)"] = eval_clean["SMAPE (%)"].str.replace("~", "").str.replace("%", "").astype(float)
+
+# Tambahkan kategori untuk warna
+eval_clean["Kategori"] = eval_clean["Kelas Model"].replace({
+    "Baseline Klasik": "Klasik",
+    "Spasial Klasik": "Klasik",
+    "Spasial + Iklim": "Klasik",
+    "Non-Linear": "Non-Linear",
+    "Non-Linear Hibrida": "Non-Linear"
+})
+
+
+#Bar Chart Terpisah - RMSE
+st.markdown("### 📊 Bar Chart - RMSE per Model")
+fig_rmse = px.bar(
+    eval_clean,
+    x="Model Spesifik",
+    y="RMSE (Ton)",
+    color="Kategori",
+    text="RMSE (Ton)",
+    color_discrete_map={"Klasik": "skyblue", "Non-Linear": "orange"}
+)
+fig_rmse.update_traces(texttemplate="%{text:.0f}", textposition="outside")
+st.plotly_chart(fig_rmse, use_container_width=True)
+
+# Bar Chart - SMAPE
+st.markdown("### 📊 Bar Chart - SMAPE per Model")
+fig_smape = px.bar(
+    eval_clean,
+    x="Model Spesifik",
+    y="SMAPE (%)",
+    color="Kategori",
+    text="SMAPE (%)",
+    color_discrete_map={"Klasik": "skyblue", "Non-Linear": "orange"}
+)
+fig_smape.update_traces(texttemplate="%{text:.0f}%", textposition="outside")
+st.plotly_chart(fig_smape, use_container_width=True)
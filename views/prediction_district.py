@@ -0,0 +1,49 @@
+import plotly.express as px
+import streamlit as st
+
+import Store
+
+# ====== Prediksi Per Kabupaten ======
+st.subheader("🤖 Prediksi Produksi Padi per Kabupaten (2025)")
+
+# Load prediksi per kabupaten
+pred_kab = Store.frame("prediction_k")
+
+# Pilih kabupaten
+kabupaten_list = pred_kab["Kabupaten_Kota"].unique()
+kabupaten = st.selectbox("Pilih Kabupaten/Kota:", kabupaten_list)
+
+df_kab = pred_kab[pred_kab["Kabupaten_Kota"] == kabupaten]
+
+# Tampilkan metrik total
+col1, col2, col3 = st.columns(3)
+col1.metric("Random Forest", f"{df_kab['RF_Pred'].sum():,.0f} ton")
+col2.metric("LightGBM", f"{df_kab['LGBM_Pred'].sum():,.0f} ton")
+col3.metric("Blended", f"{df_kab['Blended_Pred'].sum():,.0f} ton")
+
+# Line chart prediksi per bulan
+fig = px.line(
+    df_kab,
+    x="Tanggal",
+    y=["RF_Pred", "LGBM_Pred", "Blended_Pred"],
+    markers=True,
+    labels={"value": "Produksi (Ton)", "variable": "Model"},
+    title=f"Prediksi Produksi Padi Kabupaten {kabupaten} Tahun 2025"
+)
+
+# Band prediksi (kuantil per pohon RF / model kuantil LightGBM) jika ada di CSV
+band_colors = {"RF": "rgba(255, 165, 0, 0.2)", "LGBM": "rgba(0, 128, 0, 0.2)"}
+for model, color in band_colors.items():
+    bands = sorted(c for c in df_kab.columns if c.startswith(f"{model}_Q"))
+    if len(bands) < 2:
+        continue
+    lower, upper = bands[0], bands[-1]
+    fig.add_scatter(x=df_kab["Tanggal"], y=df_kab[upper], mode="lines", line={"width": 0},
+                    showlegend=False, hoverinfo="skip")
+    fig.add_scatter(x=df_kab["Tanggal"], y=df_kab[lower], mode="lines", line={"width": 0},
+                    fill="tonexty", fillcolor=color, name=f"{model} {lower[-3:]}–{upper[-3:]}")
+st.plotly_chart(fig, use_container_width=True)
+
+# Tabel detail
+st.markdown("### 📅 Detail Prediksi")
+st.dataframe(df_kab, use_container_width=True)
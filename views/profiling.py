@@ -0,0 +1,16 @@
+import streamlit as st
+
+import Trace
+
+# ====== Profiling (tersembunyi) ======
+st.subheader("⏱️ Span Paling Lambat")
+spans = Trace.load_spans()
+if not Trace.ENABLED:
+    st.info("Tracing nonaktif. Jalankan dengan LIMAO_TRACE=1 untuk merekam span baru.")
+if spans.empty:
+    st.write(f"Belum ada span di {Trace.LOG_PATH}.")
+else:
+    st.markdown("### Ringkasan per span")
+    st.dataframe(Trace.slowest(spans).round(4), use_container_width=True)
+    st.markdown("### 20 span terlama")
+    st.dataframe(spans.sort_values("wall_s", ascending=False).head(20), use_container_width=True)
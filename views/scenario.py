@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import Artifacts
+import Scenario
+import Store
+
+CLIMATE_LABELS = {
+    "Suhu_Rata_C_clean": "Suhu (Δ °C)",
+    "Curah_Hujan_mm_clean": "Curah Hujan (Δ %)",
+    "Kelembapan_Persen_clean": "Kelembapan (Δ %)",
+}
+# Suhu digeser (°C), curah hujan & kelembapan diskalakan (%) terhadap klimatologi
+SHIFT_DRIVERS = {"Suhu_Rata_C_clean"}
+GRID_CHANGES = np.round(np.arange(-0.5, 0.51, 0.1), 2) + 0.0
+
+
+# Engine (history, lag state, klimatologi, model) dimuat sekali per versi data/model
+@st.cache_resource
+def load_engine(data_version, artifact_version):
+    return Scenario.load_engine(artifact_version)
+
+
+def adjustments(table, periods):
+    # Tabel per bulan -> array scale/shift (periods, n_climate) untuk ScenarioEngine
+    scale = np.ones((periods, len(Scenario.CLIMATE_COLS)))
+    shift = np.zeros_like(scale)
+    for i, col in enumerate(Scenario.CLIMATE_COLS):
+        values = table[CLIMATE_LABELS[col]].fillna(0).to_numpy(dtype=float)
+        if col in SHIFT_DRIVERS:
+            shift[:, i] = values
+        else:
+            scale[:, i] = 1 + values / 100
+    return scale, shift
+
+
+# ====== Skenario Iklim ======
+st.subheader("🌦️ Skenario What-If Iklim")
+st.caption("Iklim bulan-bulan mendatang diisi klimatologi (rata-rata per kabupaten per bulan kalender), "
+           "lalu digeser/diskalakan sesuai skenario. Semua skenario dihitung dalam satu batch.")
+
+engine = load_engine(Store.version("limao"), Artifacts.latest_version())
+periods = st.slider("Horizon (bulan):", 1, 24, 12)
+dates = engine.future_dates(periods)
+
+st.markdown("### Perubahan iklim untuk semua bulan")
+col1, col2, col3 = st.columns(3)
+uniform = {
+    "Suhu_Rata_C_clean": col1.slider(CLIMATE_LABELS["Suhu_Rata_C_clean"], -3.0, 3.0, 0.0, 0.1),
+    "Curah_Hujan_mm_clean": col2.slider(CLIMATE_LABELS["Curah_Hujan_mm_clean"], -50, 50, -20, 5),
+    "Kelembapan_Persen_clean": col3.slider(CLIMATE_LABELS["Kelembapan_Persen_clean"], -30, 30, 0, 5),
+}
+
+with st.expander("Atur per bulan (ditambahkan ke perubahan di atas)"):
+    per_month = st.data_editor(
+        pd.DataFrame({"Bulan": dates.strftime("%Y-%m"), **{label: 0.0 for label in CLIMATE_LABELS.values()}}),
+        disabled=["Bulan"], hide_index=True, use_container_width=True, key=f"per_month_{periods}")
+table = per_month.copy()
+for col, value in uniform.items():
+    table[CLIMATE_LABELS[col]] = table[CLIMATE_LABELS[col]].fillna(0) + value
+
+grid_driver = st.selectbox("Kurva sensitivitas untuk:", Scenario.CLIMATE_COLS, index=1,
+                           format_func=lambda c: CLIMATE_LABELS[c].split(" (")[0])
+
+# Satu batch: [klimatologi, skenario pengguna, grid sensitivitas ...]
+user_scale, user_shift = adjustments(table, periods)
+grid_scale, grid_shift = Scenario.sensitivity_grid(grid_driver, GRID_CHANGES)
+scale = np.concatenate([np.ones((1, periods, 3)), user_scale[None], np.repeat(grid_scale[:, None], periods, axis=1)])
+shift = np.concatenate([np.zeros((1, periods, 3)), user_shift[None], np.repeat(grid_shift[:, None], periods, axis=1)])
+
+start = time.perf_counter()
+result = engine.run(scale, shift, periods)
+seconds = time.perf_counter() - start
+st.caption(f"{len(scale)} skenario × {len(engine.districts)} kabupaten × {periods} bulan dihitung "
+           f"dalam {seconds:.2f} s")
+
+blended = result["Blended_Pred"]            # (skenario, bulan, kabupaten)
+baseline_total, scenario_total = blended[0].sum(), blended[1].sum()
+
+m1, m2, m3 = st.columns(3)
+m1.metric("Klimatologi (normal)", f"{baseline_total:,.0f} ton")
+m2.metric("Skenario", f"{scenario_total:,.0f} ton", f"{scenario_total - baseline_total:,.0f} ton")
+m3.metric("Perubahan", f"{(scenario_total / baseline_total - 1) * 100:+.1f}%")
+
+monthly = pd.DataFrame({"Tanggal": dates, "Klimatologi": blended[0].sum(axis=1), "Skenario": blended[1].sum(axis=1)})
+fig = px.line(monthly, x="Tanggal", y=["Klimatologi", "Skenario"], markers=True,
+              labels={"value": "Produksi (Ton)", "variable": ""}, title="Total Provinsi per Bulan (Blended)")
+st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### Selisih per Kabupaten/Kota")
+by_district = pd.DataFrame({
+    "Kabupaten_Kota": engine.districts.astype(str),
+    "Selisih (Ton)": blended[1].sum(axis=0) - blended[0].sum(axis=0),
+}).sort_values("Selisih (Ton)")
+fig = px.bar(by_district, x="Selisih (Ton)", y="Kabupaten_Kota", orientation="h", height=900)
+st.plotly_chart(fig, use_container_width=True)
+
+st.markdown(f"### Sensitivitas Total Produksi terhadap {CLIMATE_LABELS[grid_driver].split(' (')[0]}")
+curve = pd.DataFrame({"Perubahan (%)": GRID_CHANGES * 100, "Produksi (Ton)": blended[2:].sum(axis=(1, 2))})
+fig = px.line(curve, x="Perubahan (%)", y="Produksi (Ton)", markers=True)
+st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,10 @@
+import plotly.express as px
+import streamlit as st
+
+import Dashboard
+
+# ====== Analisis Spasial ======
+st.subheader("🗺️ Analisis Spasial: Pengaruh Cuaca Antar Daerah")
+corr = Dashboard.load_cube()["corr"]
+fig = px.imshow(corr, text_auto=True, color_continuous_scale="RdBu_r")
+st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,10 @@
+import plotly.express as px
+import streamlit as st
+
+import Dashboard
+
+# ====== Trend Produksi ======
+st.subheader("📈 Trend Produksi Padi Per Tahun")
+trend = Dashboard.load_cube()["trend"]
+fig = px.line(trend, x="Tahun", y="Produksi_Padi_Ton_clean", markers=True)
+st.plotly_chart(fig, use_container_width=True)
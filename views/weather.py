@@ -0,0 +1,14 @@
+import streamlit as st
+
+import Dashboard
+
+# ====== Hubungan Cuaca ======
+st.subheader("☁️ Hubungan Faktor Cuaca dengan Produksi Padi")
+faktor_map = {
+    "Suhu": "Suhu_Rata_C_clean",
+    "Curah Hujan": "Curah_Hujan_mm_clean",
+    "Kelembapan": "Kelembapan_Persen_clean"
+}
+faktor = st.selectbox("Pilih faktor cuaca:", list(faktor_map.keys()))
+fig = Dashboard.scatter_figure(faktor_map[faktor], "Produksi_Padi_Ton_clean")
+st.plotly_chart(fig, use_container_width=True)